@@ -0,0 +1,226 @@
+"""
+Cascade parameter autotuner for ZeroTrust Workspace Guardian
+Sweeps the Haar cascade settings of config.FACE_DETECTION (scaleFactor,
+minNeighbors, minSize, maxSize) over a labelled recording, measuring detection
+time and exact-count accuracy, and prints the Pareto front: the settings that
+no other setting beats on both speed and accuracy.
+
+The cascade runs once per (scaleFactor, minSize, maxSize) with grouping off;
+each minNeighbors value is then applied with cv2.groupRectangles, the same
+grouping detectMultiScale does internally. Settings on the front are re-run
+with the real detector, so the numbers printed for them are exact.
+
+--write-preset saves the chosen setting to tuned_presets.json, which config.py
+merges into PRESETS; enable it with ACTIVE_PRESET = '<name>'.
+
+Usage:
+    python autotune.py office_clip.mp4 --labels counts.json
+    python autotune.py office_clip.mp4 --labels counts.json --max-ms 40 --write-preset office
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+import config
+from benchmark import benchmark_backend, load_frames
+from face_detection import HAAR_FRONTAL, create_face_detector, non_max_suppression
+from frame_context import FrameContext
+from guardian import face_detector_options
+
+DEFAULT_GRID = {
+    'scaleFactor': (1.05, 1.1, 1.15, 1.2, 1.3),
+    'minNeighbors': (3, 4, 5, 6, 7, 8),
+    'minSize': ((60, 60), (80, 80), (100, 100)),
+    'maxSize': ((300, 300), (400, 400)),
+}
+
+# Grouping tolerance detectMultiScale uses for minNeighbors
+GROUP_EPS = 0.2
+
+
+def group(rects, min_neighbors):
+    """Merge raw cascade hits the way detectMultiScale does for minNeighbors"""
+    if min_neighbors <= 0 or not rects:
+        return rects
+    grouped, _ = cv2.groupRectangles(rects, min_neighbors, GROUP_EPS)
+    return [list(rect) for rect in grouped]
+
+
+def accuracy(counts, labels):
+    pairs = list(zip(counts, labels))
+    return sum(1 for count, expected in pairs if count == expected) / len(pairs)
+
+
+def sweep(frames, labels, grid=None):
+    """Time and score every setting in grid; returns one result per setting"""
+    grid = grid or DEFAULT_GRID
+    cascade = cv2.CascadeClassifier(HAAR_FRONTAL)
+    if cascade.empty():
+        raise IOError(f"Could not load face cascade: {HAAR_FRONTAL}")
+
+    context = FrameContext()
+    images = [context.reset(frame).equalized.copy() for frame in frames]
+
+    results = []
+    for scale_factor, min_size, max_size in itertools.product(
+            grid['scaleFactor'], grid['minSize'], grid['maxSize']):
+        start = time.perf_counter()
+        raw = [
+            np.asarray(cascade.detectMultiScale(
+                image,
+                scaleFactor=scale_factor,
+                minNeighbors=0,
+                minSize=tuple(min_size),
+                maxSize=tuple(max_size),
+                flags=cv2.CASCADE_SCALE_IMAGE
+            )).reshape(-1, 4).tolist()
+            for image in images
+        ]
+        cascade_time = time.perf_counter() - start
+
+        for min_neighbors in grid['minNeighbors']:
+            start = time.perf_counter()
+            counts = [len(non_max_suppression(group(rects, min_neighbors))) for rects in raw]
+            elapsed = cascade_time + time.perf_counter() - start
+            results.append({
+                'params': {
+                    'scaleFactor': scale_factor,
+                    'minNeighbors': min_neighbors,
+                    'minSize': tuple(min_size),
+                    'maxSize': tuple(max_size),
+                },
+                'ms_per_frame': elapsed / len(images) * 1000,
+                'accuracy': accuracy(counts, labels),
+                'exact': False,
+            })
+    return results
+
+
+def pareto_front(results):
+    """Results not beaten on both ms/frame and accuracy, fastest first"""
+    front = []
+    for result in sorted(results, key=lambda r: (r['ms_per_frame'], -r['accuracy'])):
+        if not front or result['accuracy'] > front[-1]['accuracy']:
+            front.append(result)
+    return front
+
+
+def measure(params, frames, labels):
+    """Re-run one setting with the guardian's own detector"""
+    options = dict(
+        face_detector_options(),
+        scale_factor=params['scaleFactor'],
+        min_neighbors=params['minNeighbors'],
+        min_size=params['minSize'],
+        max_size=params['maxSize'],
+        coarse_to_fine=False,  # The sweep times full-frame detection
+    )
+    stats = benchmark_backend(create_face_detector('haar', options), frames, labels)
+    return {'params': params, 'ms_per_frame': stats['ms_per_frame'], 'accuracy': stats['accuracy'], 'exact': True}
+
+
+def choose(front, max_ms=None):
+    """Most accurate setting within the time budget (fastest on ties)"""
+    candidates = [r for r in front if max_ms is None or r['ms_per_frame'] <= max_ms]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda r: (r['accuracy'], -r['ms_per_frame']))
+
+
+def write_preset(name, params, path=config.TUNED_PRESETS_PATH):
+    """Save params as preset name: the active preset's settings plus the tuned FACE_DETECTION"""
+    presets = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            presets = json.load(f)
+    preset = copy.deepcopy(config.PRESETS.get(config.ACTIVE_PRESET, {}))
+    preset.setdefault('FACE_DETECTION', {}).update(params)
+    presets[name] = preset
+    with open(path, 'w') as f:
+        json.dump(presets, f, indent=2)
+    return path
+
+
+def run_autotune(path, labels, grid=None, max_frames=None, step=1):
+    frames = load_frames(path, max_frames=max_frames)[::step]
+    labels = labels[::step]
+    if not frames:
+        raise ValueError(f"No frames in {path}")
+    if len(labels) < len(frames):
+        raise ValueError(f"{len(labels)} labels for {len(frames)} frames")
+
+    results = sweep(frames, labels, grid)
+    front = pareto_front([measure(r['params'], frames, labels) for r in pareto_front(results)])
+    return results, front
+
+
+def format_results(results, chosen=None):
+    lines = [f"{'scaleFactor':>12}{'minNeighbors':>14}{'minSize':>12}{'maxSize':>12}{'ms/frame':>10}{'accuracy':>10}"]
+    for result in results:
+        params = result['params']
+        marker = '  <-' if result is chosen else ''
+        lines.append(f"{params['scaleFactor']:>12}{params['minNeighbors']:>14}"
+                     f"{'x'.join(map(str, params['minSize'])):>12}{'x'.join(map(str, params['maxSize'])):>12}"
+                     f"{result['ms_per_frame']:>10.2f}{result['accuracy']:>10.1%}{marker}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune Haar cascade parameters on a labelled clip")
+    parser.add_argument('path', help="Video file or directory of images")
+    parser.add_argument('--labels', required=True, help="JSON list with the expected face count of every frame")
+    parser.add_argument('--scale-factors', type=float, nargs='+', help="scaleFactor values to try")
+    parser.add_argument('--min-neighbors', type=int, nargs='+', help="minNeighbors values to try")
+    parser.add_argument('--min-sizes', type=int, nargs='+', help="Square minSize values to try")
+    parser.add_argument('--max-sizes', type=int, nargs='+', help="Square maxSize values to try")
+    parser.add_argument('--max-frames', type=int, help="Only use the first N frames")
+    parser.add_argument('--step', type=int, default=1, help="Only use every Nth frame")
+    parser.add_argument('--max-ms', type=float, help="Time budget per frame when choosing a setting")
+    parser.add_argument('--write-preset', metavar='NAME', help="Save the chosen setting as a preset")
+    parser.add_argument('--output', help="Also write every result as JSON")
+    args = parser.parse_args()
+
+    with open(args.labels) as f:
+        labels = json.load(f)
+
+    grid = dict(DEFAULT_GRID)
+    if args.scale_factors:
+        grid['scaleFactor'] = args.scale_factors
+    if args.min_neighbors:
+        grid['minNeighbors'] = args.min_neighbors
+    if args.min_sizes:
+        grid['minSize'] = [(size, size) for size in args.min_sizes]
+    if args.max_sizes:
+        grid['maxSize'] = [(size, size) for size in args.max_sizes]
+
+    results, front = run_autotune(args.path, labels, grid, args.max_frames, args.step)
+    chosen = choose(front, args.max_ms)
+
+    print("\n" + "=" * 70)
+    print(f"🎯 Cascade Autotune: {args.path} ({len(results)} settings)")
+    print("=" * 70)
+    print("Pareto front (speed vs. accuracy):")
+    print(format_results(front, chosen))
+    print("=" * 70)
+
+    if chosen is None:
+        print(f"❌ No setting runs within {args.max_ms}ms per frame")
+    elif args.write_preset:
+        path = write_preset(args.write_preset, chosen['params'])
+        print(f"✅ Saved preset '{args.write_preset}' to {path}")
+        print(f"   Enable it with ACTIVE_PRESET = '{args.write_preset}' in config.py")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'results': results, 'front': front}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Face-detector benchmark for ZeroTrust Workspace Guardian
+Runs every available backend over the same recorded clip and reports
+throughput and detection rate, to pick a backend per hardware tier.
+
+Frames are decoded up front, so only detection is timed. With --labels (a JSON
+list of the expected face count per frame) the exact-count accuracy is shown too.
+
+Usage:
+    python benchmark.py office_clip.mp4
+    python benchmark.py office_clip.mp4 --backends haar dnn --labels counts.json
+"""
+
+import argparse
+import json
+import time
+
+import cv2
+
+import config
+from capture import open_source
+from face_detection import BACKENDS, create_face_detector, non_max_suppression
+from frame_context import FrameContext
+from guardian import dnn_detector_options, face_detector_options
+
+
+def load_frames(path, fps=None, max_frames=None):
+    source = open_source(path, fps)
+    frames = []
+    try:
+        while max_frames is None or len(frames) < max_frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            frames.append(frame)
+    finally:
+        source.release()
+    return frames
+
+
+def benchmark_backend(detector, frames, labels=None, batch_size=1):
+    """Time detector over frames; returns fps, detection rate, mean faces and label accuracy"""
+    context = FrameContext()
+    counts = []
+
+    # Warm-up: first calls allocate and (for DNN) initialise layers
+    detector.detect(context.reset(frames[0]))
+
+    start = time.perf_counter()
+    if batch_size > 1 and hasattr(detector, 'detect_batch'):
+        for i in range(0, len(frames), batch_size):
+            counts.extend(len(non_max_suppression(faces)) for faces in detector.detect_batch(frames[i:i + batch_size]))
+    else:
+        for frame in frames:
+            counts.append(len(non_max_suppression(detector.detect(context.reset(frame)))))
+    elapsed = time.perf_counter() - start
+
+    result = {
+        'frames': len(frames),
+        'fps': len(frames) / elapsed if elapsed > 0 else 0.0,
+        'ms_per_frame': elapsed / len(frames) * 1000,
+        'detection_rate': sum(1 for count in counts if count > 0) / len(counts),
+        'mean_faces': sum(counts) / len(counts),
+        'accuracy': None,
+    }
+    if labels is not None:
+        pairs = list(zip(counts, labels))
+        result['accuracy'] = sum(1 for count, expected in pairs if count == expected) / len(pairs)
+    return result
+
+
+def run_benchmark(path, backends=None, labels=None, fps=None, max_frames=None, batch_size=None):
+    frames = load_frames(path, fps, max_frames)
+    if not frames:
+        raise ValueError(f"No frames in {path}")
+    if batch_size is None:
+        batch_size = config.FACE_DETECTION.get('batch_size', 1)
+
+    results = {}
+    for backend in backends or BACKENDS:
+        try:
+            detector = create_face_detector(backend, face_detector_options(), dnn_detector_options())
+        except (IOError, cv2.error, ValueError) as e:
+            results[backend] = {'error': str(e)}
+            continue
+        results[backend] = benchmark_backend(detector, frames, labels, batch_size)
+    return results
+
+
+def format_results(results):
+    lines = [f"{'Backend':<14}{'fps':>8}{'ms/frame':>10}{'detected':>10}{'faces':>7}{'accuracy':>10}"]
+    for backend, stats in results.items():
+        if 'error' in stats:
+            lines.append(f"{backend:<14}  unavailable: {stats['error']}")
+            continue
+        accuracy = f"{stats['accuracy']:.1%}" if stats['accuracy'] is not None else '-'
+        lines.append(f"{backend:<14}{stats['fps']:>8.1f}{stats['ms_per_frame']:>10.2f}"
+                     f"{stats['detection_rate']:>10.1%}{stats['mean_faces']:>7.2f}{accuracy:>10}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare face-detector backends on a recorded clip")
+    parser.add_argument('path', help="Video file or directory of images")
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, help="Backends to run (default: all)")
+    parser.add_argument('--labels', help="JSON list with the expected face count of every frame")
+    parser.add_argument('--max-frames', type=int, help="Only use the first N frames")
+    parser.add_argument('--batch-size', type=int, help="Frames per forward pass for batched backends")
+    parser.add_argument('--output', help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    labels = None
+    if args.labels:
+        with open(args.labels) as f:
+            labels = json.load(f)
+
+    results = run_benchmark(args.path, args.backends, labels, max_frames=args.max_frames,
+                            batch_size=args.batch_size)
+
+    print("\n" + "=" * 60)
+    print(f"📊 Face Detector Benchmark: {args.path}")
+    print("=" * 60)
+    print(format_results(results))
+    print("=" * 60)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
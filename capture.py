@@ -0,0 +1,193 @@
+"""
+Frame capture for ZeroTrust Workspace Guardian
+Reads the camera on its own thread so detection always sees the newest frame
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+class FrameGrabber:
+    def __init__(self, cap, buffer_size=2):
+        self.cap = cap
+
+        # Bounded buffer: appending to a full deque silently drops the oldest frame
+        self.buffer = deque(maxlen=max(1, buffer_size))
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.ended = False
+
+        # Counters
+        self.frames_grabbed = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.last_frame_time = None
+
+    def start(self):
+        """Start the background capture thread"""
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._grab_loop, name="FrameGrabber", daemon=True)
+        self.thread.start()
+        return self
+
+    def _grab_loop(self):
+        """Keep pulling frames from the driver as fast as it delivers them"""
+        while self.running:
+            ret, frame = self.cap.read()
+            timestamp = time.time()
+            with self.condition:
+                if not ret:
+                    self.ended = True
+                    self.condition.notify_all()
+                    break
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.frames_dropped += 1
+                self.buffer.append((timestamp, frame))
+                self.frames_grabbed += 1
+                self.condition.notify_all()
+
+    def read(self, timeout=None):
+        """Return the newest frame, discarding any older ones still buffered"""
+        with self.condition:
+            deadline = None if timeout is None else time.time() + timeout
+            while not self.buffer and not self.ended:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False, None
+                self.condition.wait(remaining)
+
+            if not self.buffer:
+                return False, None
+
+            timestamp, frame = self.buffer.pop()
+            self.frames_dropped += len(self.buffer)
+            self.buffer.clear()
+            self.frames_processed += 1
+            self.last_frame_time = timestamp
+            return True, frame
+
+    def stats(self):
+        """Snapshot of capture counters"""
+        with self.condition:
+            return {
+                'grabbed': self.frames_grabbed,
+                'processed': self.frames_processed,
+                'dropped': self.frames_dropped,
+            }
+
+    def stop(self):
+        """Stop the capture thread (does not release the camera)"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+
+
+class CameraOpener:
+    """
+    Opens a camera on a background thread. Drivers can take a second or more to
+    negotiate, so the caller loads detectors and databases meanwhile and calls
+    result() when it needs the capture.
+    """
+
+    def __init__(self, index, width=None, height=None, buffer_size=None):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.buffer_size = buffer_size
+        self.cap = None
+        self.error = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self.thread = threading.Thread(target=self._open, name="CameraOpener", daemon=True)
+        self.thread.start()
+
+    def _open(self):
+        try:
+            cap = cv2.VideoCapture(self.index)
+            if self.width:
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            if self.height:
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            if self.buffer_size:
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+            self.cap = cap
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = time.perf_counter()
+
+    def result(self):
+        """Wait for the camera and return it (re-raises anything opening it raised)"""
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.cap
+
+
+class VideoFileSource:
+    """Recorded video file with the same read()/release() interface as a camera"""
+
+    def __init__(self, path, fps=None):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video: {path}")
+        self.fps = fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_index = 0
+        self.last_frame_time = None
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if ret:
+            # Timestamps come from the recording, not the wall clock
+            self.last_frame_time = self.frame_index / self.fps
+            self.frame_index += 1
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource:
+    """Directory of still images played back in filename order"""
+
+    IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+    def __init__(self, path, fps=None):
+        self.path = path
+        self.files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(self.IMAGE_EXTENSIONS)
+        )
+        if not self.files:
+            raise IOError(f"No images found in: {path}")
+        self.fps = fps or 30.0
+        self.frame_index = 0
+        self.last_frame_time = None
+
+    def read(self):
+        while self.frame_index < len(self.files):
+            frame = cv2.imread(self.files[self.frame_index])
+            self.last_frame_time = self.frame_index / self.fps
+            self.frame_index += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def release(self):
+        pass
+
+
+def open_source(path, fps=None):
+    """Open a video file or image directory for replay"""
+    if os.path.isdir(path):
+        return ImageDirectorySource(path, fps)
+    return VideoFileSource(path, fps)
@@ -0,0 +1,205 @@
+"""
+Pre-event clip recording for ZeroTrust Workspace Guardian
+Keeps the last few seconds of camera frames in a preallocated ring so that,
+when a threat fires, the moments leading up to it can be saved as a short
+video clip together with a post-roll of what happened next.
+
+The ring and the post-roll buffer are allocated once for the camera's frame
+shape (within a byte budget) and frames are copied into them in place, so
+memory use is fixed and recording a frame allocates nothing. Frames are kept
+at clip_fps, not camera rate. The clip is gathered when its post-roll has
+elapsed and encoded by the evidence writer's pool, off the detection thread.
+"""
+
+import cv2
+import numpy as np
+
+CLIP_EXTENSION = '.avi'
+CLIP_FOURCC = 'MJPG'
+
+
+def write_clip(path, frames, fps):
+    """Encode frames (N x h x w x 3) to an MJPEG .avi and return path"""
+    height, width = frames.shape[1:3]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*CLIP_FOURCC), fps, (width, height))
+    if not writer.isOpened():
+        # Raised so the evidence writer reports and counts it as a failed write
+        raise IOError(f"Could not open {CLIP_FOURCC} video writer for {path}")
+    try:
+        for frame in frames:
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+class FrameRing:
+    """Fixed number of frame slots, overwritten oldest first"""
+
+    def __init__(self):
+        self.capacity = 0
+        self.frames = None  # Allocated once the frame size is known
+        self.times = None
+        self.head = 0  # Next slot to write
+        self.count = 0
+
+    @property
+    def nbytes(self):
+        return 0 if self.frames is None else self.frames.nbytes
+
+    def allocate(self, shape, dtype, capacity):
+        self.capacity = capacity
+        self.frames = np.empty((capacity,) + shape, dtype)
+        self.times = np.full(capacity, -np.inf)
+        self.head = 0
+        self.count = 0
+
+    def push(self, frame, timestamp):
+        np.copyto(self.frames[self.head], frame)
+        self.times[self.head] = timestamp
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def ordered(self):
+        """Slot indexes, oldest first"""
+        return np.arange(self.head - self.count, self.head) % self.capacity
+
+    def between(self, start, end):
+        """Copies of the buffered frames with start <= timestamp <= end, oldest first, and their times"""
+        order = self.ordered()
+        order = order[(self.times[order] >= start) & (self.times[order] <= end)]
+        return self.frames[order], self.times[order]
+
+
+class ClipRecorder:
+    """
+    Pre-event ring plus a separate post-roll buffer; clips are handed to an
+    EvidenceWriter when complete. Pre-event slots come first out of the byte
+    budget, so a tight budget shortens the post-roll, not the moments before
+    the threat.
+    """
+
+    def __init__(self, evidence_writer, seconds=5.0, post_seconds=2.0, fps=10, max_bytes=None):
+        self.evidence_writer = evidence_writer
+        self.seconds = seconds
+        self.post_seconds = post_seconds
+        self.fps = fps
+        self.interval = 1.0 / fps
+        self.max_bytes = max_bytes
+        self.pre_slots = round(seconds * fps) + 1
+        self.post_slots = round(post_seconds * fps)
+        self.next_due = -np.inf
+
+        # While a clip records its post-roll the ring holds still and new frames go to post_frames
+        self.ring = FrameRing()
+        self.post_frames = None
+        self.post_times = None
+        self.post_count = 0
+        self.active = None  # (path, start, trigger time, end) of the clip recording its post-roll
+
+        # Counters
+        self.frames_recorded = 0
+        self.clips_started = 0
+        self.clips_submitted = 0
+        self.clips_failed = 0
+
+    @classmethod
+    def from_config(cls, evidence_writer, settings):
+        max_mb = settings.get('clip_buffer_mb')
+        return cls(
+            evidence_writer,
+            settings.get('clip_seconds', 5.0),
+            settings.get('clip_post_seconds', 2.0),
+            settings.get('clip_fps', 10),
+            max_mb * 1024 * 1024 if max_mb else None,
+        )
+
+    @property
+    def nbytes(self):
+        return self.ring.nbytes + (0 if self.post_frames is None else self.post_frames.nbytes)
+
+    def allocate(self, shape, dtype):
+        """Size both buffers for frames of shape within the byte budget, pre-event slots first"""
+        pre, post = self.pre_slots, self.post_slots
+        if self.max_bytes:
+            slots = self.max_bytes // (int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            pre = max(1, min(pre, slots))
+            post = max(0, min(post, slots - pre))
+            if pre < self.pre_slots or post < self.post_slots:
+                print(f"⚠️  Evidence clips limited to {(pre - 1) / self.fps:.1f}s before and {post / self.fps:.1f}s "
+                      f"after a threat at {shape[1]}x{shape[0]} (clip_buffer_mb); "
+                      f"raise it or lower clip_fps for {self.seconds:g}s + {self.post_seconds:g}s")
+        self.ring.allocate(shape, dtype, pre)
+        self.post_frames = np.empty((post,) + shape, dtype)
+        self.post_times = np.full(post, -np.inf)
+        self.post_count = 0
+
+    def record(self, frame, timestamp):
+        """Buffer frame if a clip_fps slot is due, and hand over the clip once its post-roll is complete"""
+        if self.active is not None and timestamp >= self.active[3]:
+            self._finish()
+        # A quarter-interval of slack keeps a camera running at a multiple of clip_fps from skipping slots
+        if timestamp + self.interval / 4 < self.next_due:
+            return
+        self.next_due = max(self.next_due, timestamp - self.interval) + self.interval
+        self.frames_recorded += 1
+
+        if self.ring.frames is None or self.ring.frames.shape[1:] != frame.shape:
+            # Only a change of camera resolution reallocates; a clip in progress keeps what it has
+            if self.active is not None:
+                self._finish()
+            self.allocate(frame.shape, frame.dtype)
+        if self.active is not None and self.post_count == len(self.post_frames):
+            self._finish()  # Post-roll cut short by the byte budget
+        if self.active is None:
+            self.ring.push(frame, timestamp)
+        else:
+            np.copyto(self.post_frames[self.post_count], frame)
+            self.post_times[self.post_count] = timestamp
+            self.post_count += 1
+
+    def trigger(self, threat_type, timestamp):
+        """Start a clip around timestamp; returns the path it will be written to (None if nothing is buffered)"""
+        if self.ring.count == 0:
+            return None
+        if self.active is not None:
+            return self.active[0]  # Already recording: that clip covers this threat too
+        path = self.evidence_writer.new_path(threat_type, CLIP_EXTENSION)
+        self.active = (path, timestamp - self.seconds, timestamp, timestamp + self.post_seconds)
+        self.clips_started += 1
+        return path
+
+    def flush(self):
+        """Write the clip in progress now, with whatever post-roll has been recorded"""
+        if self.active is not None:
+            self._finish()
+
+    def _finish(self):
+        path, start, trigger_time, _ = self.active
+        self.active = None
+        pre_frames, pre_times = self.ring.between(start, trigger_time)
+        frames = np.concatenate((pre_frames, self.post_frames[:self.post_count]))
+        times = np.concatenate((pre_times, self.post_times[:self.post_count]))
+        # The post-roll becomes the newest history for the next clip
+        for i in range(self.post_count):
+            self.ring.push(self.post_frames[i], self.post_times[i])
+        self.post_count = 0
+
+        if len(frames) == 0:
+            self.clips_failed += 1
+            print(f"⚠️  Evidence clip not saved, no frames left for it: {path}")
+            return
+        # Play back at the rate frames were actually kept (slower cameras fill fewer slots)
+        span = times[-1] - times[0]
+        fps = min(self.fps, (len(times) - 1) / span) if span > 0 else self.fps
+        self.evidence_writer.submit(write_clip, path, frames, fps)
+        self.clips_submitted += 1
+
+    def stats(self):
+        return {
+            'frames': self.frames_recorded,
+            'clips': self.clips_submitted,
+            'failed': self.clips_failed,
+            'pending': int(self.active is not None),
+            'buffer_bytes': self.nbytes,
+        }
@@ -3,25 +3,57 @@ Configuration file for ZeroTrust Workspace Guardian
 Adjust these settings for optimal accuracy in your environment
 """
 
+import json
+import os
+
 # ============================================
 # FACE DETECTION SETTINGS
 # ============================================
 
 # Face detection parameters (adjust for your lighting/camera)
 FACE_DETECTION = {
+    'backend': 'haar',        # 'haar', 'haar_profile' (also sideways faces) or 'dnn' (python benchmark.py to compare)
     'scaleFactor': 1.1,       # 1.1-1.3: Lower = more sensitive but slower
     'minNeighbors': 6,        # 3-8: Higher = fewer false positives
     'minSize': (80, 80),      # Minimum face size in pixels
     'maxSize': (400, 400),    # Maximum face size in pixels
+    'coarse_to_fine': False,  # Find candidates on a downscaled frame, confirm at full size
+    'downscale_factor': 2.0,  # Coarse pass scale; keep minSize / factor >= 24
+    'coarse_scale_factor': 1.2,  # Pyramid step for the coarse pass (bigger = faster)
+    'dnn_model': 'models/res10_300x300_ssd_iter_140000.caffemodel',  # Local file, never downloaded
+    'dnn_config': 'models/deploy.prototxt',
+    'dnn_confidence': 0.6,
+    'dnn_input_size': (300, 300),
+    'threads': None,          # OpenCV CPU threads (None = OpenCV default)
+    'batch_size': 4,          # Frames per DNN forward pass when benchmarking
 }
 
 # Stabilization settings
 STABILIZATION = {
-    'face_history_length': 30,    # Number of frames to track (higher = more stable)
-    'phone_history_length': 10,   # Frames for phone detection
+    'face_history_length': 30,    # Frames to track when no time window is set
+    'phone_history_length': 10,   # Frames for phone detection when no time window is set
+    'face_history_seconds': 1.0,  # Time window (same smoothing at any frame rate); None = frame count
+    'phone_history_seconds': 0.3,
     'consistency_threshold': 0.6,  # 0.0-1.0: Minimum consistency to trigger action
 }
 
+# Face tracking: keep identities across frames and run the cascade only every Nth frame
+FACE_TRACKING = {
+    'enabled': True,
+    'detect_interval': 3,          # Run face detection every N frames; tracks fill the gaps
+    'iou_threshold': 0.3,          # Minimum overlap to match a detection to a track
+    'max_missed': 3,               # Detection passes a track survives without a match
+}
+
+# Motion gating: reuse the previous frame's detections while the scene is static
+MOTION_GATING = {
+    'enabled': True,
+    'grid_size': (32, 24),         # Thumbnail compared between frames
+    'pixel_threshold': 12,         # Grey-level change that marks a thumbnail pixel as changed
+    'changed_fraction': 0.01,      # Changed pixels (0.0-1.0) that force a new detection
+    'max_reuse_ms': 500,           # Always run full detection at least this often
+}
+
 # ============================================
 # THREAT DETECTION SETTINGS
 # ============================================
@@ -29,7 +61,7 @@ STABILIZATION = {
 # Shoulder surfing (multiple faces)
 SHOULDER_SURFING = {
     'enabled': True,
-    'confirmation_threshold': 4,   # Consecutive detections needed
+    'confirmation_seconds': 0.5,   # How long the threat must persist before acting
     'cooldown_seconds': 3.0,       # Time between actions
     'action': 'minimize',          # 'minimize', 'blur', or 'lock'
 }
@@ -37,7 +69,7 @@ SHOULDER_SURFING = {
 # Camera/Phone detection
 CAMERA_DETECTION = {
     'enabled': True,
-    'confirmation_threshold': 3,
+    'confirmation_seconds': 0.5,
     'cooldown_seconds': 3.0,
     'min_area': 3000,              # Minimum object size
     'max_area': 80000,             # Maximum object size
@@ -45,6 +77,8 @@ CAMERA_DETECTION = {
         'portrait': (0.35, 0.75),  # Phone in portrait mode
         'landscape': (1.3, 2.2),   # Phone in landscape mode
     },
+    'person_roi': False,           # Only search around and beside detected faces (whole frame if none)
+    'roi_margin': (2.0, 3.0),      # Face widths to each side, face heights below
     'action': 'minimize',
 }
 
@@ -52,6 +86,8 @@ CAMERA_DETECTION = {
 USER_ABSENCE = {
     'enabled': True,
     'threshold_seconds': 15,       # Time before auto-lock
+    'grace_seconds': 2.0,          # Face may be lost this long (turning away) before absence counts
+    'cooldown_seconds': 3.0,       # Minimum time before the screen is restored
     'action': 'lock',              # 'minimize' or 'lock'
 }
 
@@ -64,7 +100,36 @@ LOGGING = {
     'database_path': 'security_log.db',
     'screenshot_dir': 'threat_logs',
     'capture_screenshots': True,
-    'max_screenshots': 1000,       # Auto-cleanup after this many
+    'max_screenshots': 1000,       # Oldest evidence is deleted beyond this many files
+    'max_evidence_mb': 500,        # ...or beyond this many megabytes (None = no limit)
+    'evidence_workers': 2,         # Background threads encoding evidence
+    'jpeg_quality': 90,
+    'save_clips': True,            # Also save a short video clip around each threat
+    'clip_seconds': 5.0,           # Seconds kept before the threat
+    'clip_post_seconds': 2.0,      # ...and recorded after it
+    'clip_fps': 10,                # Frame rate of the buffer and the saved clip
+    'clip_buffer_mb': 64,          # Memory cap of the frame buffers; at high resolution the post-roll is cut first
+    'write_batch_size': 50,        # Threat rows committed per transaction
+    'write_flush_interval': 0.5,   # Seconds the background writer waits for more rows
+}
+
+# Per-frame telemetry, kept apart from the threat log and rolled up to 1s/1m/1h
+TELEMETRY = {
+    'enabled': True,
+    'database_path': 'telemetry.db',
+    'sample_rate': 5,              # Samples recorded per second (0 = every frame)
+    'flush_interval': 1.0,         # Seconds between background writes
+    'keep_samples_hours': 1,       # Raw samples
+    'keep_1s_hours': 24,           # Rollup retention per resolution (None = forever)
+    'keep_1m_days': 30,
+    'keep_1h_days': 365,
+}
+
+# Prometheus-style metrics endpoint for fleet monitoring (http://host:port/metrics)
+METRICS = {
+    'enabled': False,
+    'host': '127.0.0.1',           # Localhost only; a scraper on the same machine or a local agent reads it
+    'port': 9464,
 }
 
 # ============================================
@@ -78,6 +143,7 @@ DISPLAY = {
     'show_labels': True,
     'show_confidence': True,
     'show_stats': True,
+    'refresh_hz': 30,              # Overlay redraws per second at most (0 = every frame)
 }
 
 # ============================================
@@ -89,6 +155,14 @@ PERFORMANCE = {
     'frame_width': 640,            # Lower = faster processing
     'frame_height': 480,
     'fps_limit': 30,               # Maximum FPS
+    'cameras': None,               # Several cameras in one process, e.g. [0, 1] (python multicam.py)
+    'camera_workers': None,        # Detection threads for multicam (None = one per core)
+    'threaded_capture': True,      # Grab frames on a background thread
+    'capture_buffer_size': 2,      # Frames buffered before the oldest is dropped
+    'parallel_detectors': False,   # Run face and phone detection at the same time in worker processes
+    'detector_workers': None,      # Worker processes (None = one per detector)
+    'timing_window': 300,          # Frames kept for per-stage latency percentiles
+    'timing_report': None,         # Write stage timings as JSON on exit (path)
 }
 
 # ============================================
@@ -99,6 +173,8 @@ ADVANCED = {
     'debug_mode': False,           # Print detailed logs
     'test_mode': False,            # Don't actually minimize/lock
     'auto_start_dashboard': True,  # Launch dashboard automatically
+    'live_reload': True,           # Apply edits to this file while the guardian runs
+    'reload_interval': 1.0,        # Seconds between checks for changes
 }
 
 # ============================================
@@ -107,22 +183,39 @@ ADVANCED = {
 
 PRESETS = {
     'high_security': {
-        'SHOULDER_SURFING': {'confirmation_threshold': 2, 'cooldown_seconds': 2.0},
-        'CAMERA_DETECTION': {'confirmation_threshold': 2, 'cooldown_seconds': 2.0},
+        'SHOULDER_SURFING': {'confirmation_seconds': 0.25, 'cooldown_seconds': 2.0},
+        'CAMERA_DETECTION': {'confirmation_seconds': 0.25, 'cooldown_seconds': 2.0},
         'USER_ABSENCE': {'threshold_seconds': 10},
     },
     'balanced': {
-        'SHOULDER_SURFING': {'confirmation_threshold': 3, 'cooldown_seconds': 3.0},
-        'CAMERA_DETECTION': {'confirmation_threshold': 3, 'cooldown_seconds': 3.0},
+        'SHOULDER_SURFING': {'confirmation_seconds': 0.5, 'cooldown_seconds': 3.0},
+        'CAMERA_DETECTION': {'confirmation_seconds': 0.5, 'cooldown_seconds': 3.0},
         'USER_ABSENCE': {'threshold_seconds': 15},
     },
     'low_sensitivity': {
-        'SHOULDER_SURFING': {'confirmation_threshold': 5, 'cooldown_seconds': 5.0},
-        'CAMERA_DETECTION': {'confirmation_threshold': 5, 'cooldown_seconds': 5.0},
+        'SHOULDER_SURFING': {'confirmation_seconds': 1.0, 'cooldown_seconds': 5.0},
+        'CAMERA_DETECTION': {'confirmation_seconds': 1.0, 'cooldown_seconds': 5.0},
         'USER_ABSENCE': {'threshold_seconds': 30},
     },
 }
 
+# Presets saved by `python autotune.py --write-preset NAME`
+TUNED_PRESETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tuned_presets.json')
+
+def load_tuned_presets(path=TUNED_PRESETS_PATH):
+    """Merge autotuned presets into PRESETS (JSON lists become size tuples)"""
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        tuned = json.load(f)
+    for name, preset in tuned.items():
+        PRESETS[name] = {
+            category: {key: tuple(value) if isinstance(value, list) else value for key, value in settings.items()}
+            for category, settings in preset.items()
+        }
+
+load_tuned_presets()
+
 # Select active preset
 ACTIVE_PRESET = 'balanced'  # 'high_security', 'balanced', or 'low_sensitivity'
 
@@ -0,0 +1,80 @@
+"""
+Live configuration reload for ZeroTrust Workspace Guardian
+Watches config.py (and the autotuned presets next to it) and reloads the module
+when either file changes, reporting which settings sections differ so the
+guardian rebuilds only what they affect. A config.py that fails to load is
+reported and the previous settings stay in force.
+"""
+
+import importlib
+import os
+import time
+
+import config
+
+
+# Preset definitions only matter through the sections the active preset updates
+NOT_SETTINGS = {'PRESETS', 'TUNED_PRESETS_PATH'}
+
+
+def settings_sections(module):
+    """Upper-case module globals: FACE_DETECTION, STABILIZATION, ..., ACTIVE_PRESET"""
+    return {name: value for name, value in vars(module).items()
+            if name.isupper() and name not in NOT_SETTINGS and not callable(value)}
+
+
+class ConfigWatcher:
+    def __init__(self, interval=1.0, paths=None):
+        self.interval = interval
+        self.paths = paths or [config.__file__, config.TUNED_PRESETS_PATH]
+        self.mtimes = self._mtimes()
+        self.next_check = time.monotonic() + interval
+
+        # Counters
+        self.reloads = 0
+        self.failures = 0
+
+    def _mtimes(self):
+        mtimes = {}
+        for path in self.paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    def poll(self):
+        """Reload config if a watched file changed; returns the names of changed sections"""
+        now = time.monotonic()
+        if now < self.next_check:
+            return set()
+        self.next_check = now + self.interval
+
+        mtimes = self._mtimes()
+        if mtimes == self.mtimes:
+            return set()
+        self.mtimes = mtimes
+        return self.reload()
+
+    def reload(self):
+        # reload() re-executes config.py in the same module object; keep the old globals to roll back
+        previous = dict(vars(config))
+        before = settings_sections(config)
+        try:
+            importlib.reload(config)
+        except Exception as e:
+            vars(config).clear()
+            vars(config).update(previous)
+            self.failures += 1
+            print(f"❌ Config reload failed, keeping previous settings: {e}")
+            return set()
+
+        self.reloads += 1
+        after = settings_sections(config)
+        return {name for name in before.keys() | after.keys() if before.get(name) != after.get(name)}
+
+    def stats(self):
+        return {
+            'reloads': self.reloads,
+            'failures': self.failures,
+        }
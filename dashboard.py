@@ -1,8 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 import sqlite3
-from datetime import datetime
+import queue
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import os
+from reports import FORMATS, default_filename, export_threats
+from storage import COUNT_BY_TYPE, SELECT_THREATS, init_schema
+
+DB_PATH = 'security_log.db'
+PAGE_SIZE = 200  # Rows fetched per page of history
 
 class SecurityDashboard:
     def __init__(self, root):
@@ -33,9 +40,12 @@ class SecurityDashboard:
                             font=('Arial', 16, 'bold'), bg='#1e1e1e', fg='white')
         log_label.pack(pady=(20, 10))
         
-        # Create Treeview for logs
+        # Create Treeview for logs (older pages load on demand when scrolled to the bottom)
+        tree_frame = tk.Frame(root, bg='#1e1e1e')
+        tree_frame.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
+        
         columns = ('ID', 'Time', 'Threat Type', 'Faces', 'Action', 'Screenshot')
-        self.tree = ttk.Treeview(root, columns=columns, show='headings', height=15)
+        self.tree = ttk.Treeview(tree_frame, columns=columns, show='headings', height=15)
         
         # Define headings
         self.tree.heading('ID', text='ID')
@@ -53,7 +63,10 @@ class SecurityDashboard:
         self.tree.column('Action', width=150)
         self.tree.column('Screenshot', width=250)
         
-        self.tree.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Buttons
         button_frame = tk.Frame(root, bg='#1e1e1e')
@@ -74,6 +87,20 @@ class SecurityDashboard:
                              padx=20, pady=10, cursor='hand2')
         clear_btn.pack(side=tk.LEFT, padx=5)
         
+        # Incremental loading state
+        self.newest_id = None
+        self.oldest_id = None
+        self.has_more = False
+        self.type_counts = Counter()
+        self.refresh_pending = False
+        self.older_pending = False
+        
+        # Queries run on one worker thread; results come back through a queue
+        self.conn = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DashboardQuery")
+        self.results = queue.Queue()
+        self.poll_results()
+        
         # Load initial data
         self.load_data()
         
@@ -96,88 +123,205 @@ class SecurityDashboard:
         # Store reference for updating
         setattr(self, f'stat_{column}', value_label)
     
-    def load_data(self):
-        """Load threat data from database"""
-        if not os.path.exists('security_log.db'):
+    def load_data(self, full=False):
+        """Fetch threats newer than the last one shown (runs off the Tk thread)"""
+        if self.refresh_pending:
             return
+        self.refresh_pending = True
+        self.submit_query(self.query_new_threats, self.on_new_threats, self.newest_id, full)
+    
+    def load_older(self):
+        """Fetch the next page of older history"""
+        if self.older_pending or not self.has_more or self.oldest_id is None:
+            return
+        self.older_pending = True
+        self.submit_query(self.query_older_threats, self.on_older_threats, self.oldest_id)
+    
+    def on_scroll(self, first, last):
+        """Keep the scrollbar in sync and load older rows when scrolled to the bottom"""
+        self.scrollbar.set(first, last)
+        if float(last) >= 1.0 and self.tree.get_children():
+            self.load_older()
+    
+    # ---- Background queries -------------------------------------------
+    
+    def submit_query(self, query, callback, *args):
+        """Run query(conn, *args) on the worker thread, then callback(result) on the Tk thread"""
+        def job():
+            try:
+                result = query(self.connection(), *args)
+            except (sqlite3.Error, OSError, ValueError) as e:
+                print(f"⚠️  Dashboard query failed: {e}")
+                result = None
+            self.results.put((callback, result))
+        self.executor.submit(job)
+    
+    def connection(self):
+        """Worker-thread database connection, opened once the database exists"""
+        if self.conn is None and os.path.exists(DB_PATH):
+            self.conn = sqlite3.connect(DB_PATH, timeout=5.0)
+            init_schema(self.conn)
+        return self.conn
+    
+    def poll_results(self):
+        """Hand finished query results to their callbacks on the Tk thread"""
+        while True:
+            try:
+                callback, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            callback(result)
+        self.root.after(100, self.poll_results)
+    
+    def query_new_threats(self, conn, newest_id, full):
+        if conn is None:
+            return None
         
-        conn = sqlite3.connect('security_log.db')
-        cursor = conn.cursor()
+        # MAX(id) is a rowid lookup; a smaller value means the log was cleared.
+        # Every query stops at max_id, so a row committed meanwhile is neither counted
+        # nor shown until the next refresh picks it up.
+        max_id = conn.execute('SELECT MAX(id) FROM threats').fetchone()[0]
+        if full or newest_id is None or max_id is None or max_id < newest_id:
+            rows = conn.execute(
+                SELECT_THREATS + ' WHERE t.id <= ? ORDER BY t.id DESC LIMIT ?', (max_id, PAGE_SIZE)
+            ).fetchall()
+            counts = conn.execute(COUNT_BY_TYPE.format(where='WHERE id <= ?'), (max_id,)).fetchall()
+            return {'reset': True, 'rows': rows, 'counts': counts, 'max_id': max_id}
         
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Only rows (and counts) added since the last refresh
+        rows = conn.execute(
+            SELECT_THREATS + ' WHERE t.id > ? AND t.id <= ? ORDER BY t.id DESC', (newest_id, max_id)
+        ).fetchall()
+        counts = conn.execute(COUNT_BY_TYPE.format(where='WHERE id > ? AND id <= ?'),
+                              (newest_id, max_id)).fetchall()
+        return {'reset': False, 'rows': rows, 'counts': counts, 'max_id': max_id}
+    
+    def query_older_threats(self, conn, oldest_id):
+        if conn is None:
+            return None
+        return conn.execute(
+            SELECT_THREATS + ' WHERE t.id < ? ORDER BY t.id DESC LIMIT ?', (oldest_id, PAGE_SIZE)
+        ).fetchall()
+    
+    def query_clear(self, conn):
+        if conn is None:
+            return None
+        with conn:
+            conn.execute('DELETE FROM threats')
+        return True
+    
+    # ---- Tk-thread result handlers ------------------------------------
+    
+    def on_new_threats(self, result):
+        self.refresh_pending = False
+        if result is None:
+            return
         
-        # Load all threats
-        cursor.execute('SELECT * FROM threats ORDER BY id DESC')
-        threats = cursor.fetchall()
+        if result['reset']:
+            self.tree.delete(*self.tree.get_children())
+            self.type_counts.clear()
+            self.oldest_id = None
+            self.has_more = len(result['rows']) == PAGE_SIZE
         
-        for threat in threats:
-            threat_id, timestamp, threat_type, face_count, action, screenshot, location = threat
-            screenshot_display = os.path.basename(screenshot) if screenshot else "N/A"
-            self.tree.insert('', tk.END, values=(
-                threat_id, timestamp, threat_type, face_count, action, screenshot_display
-            ))
+        # Rows arrive newest first; keep them above what is already shown
+        for index, threat in enumerate(result['rows']):
+            self.insert_threat(threat, index if not result['reset'] else tk.END)
         
-        # Update stats
-        total = len(threats)
-        shoulder = len([t for t in threats if 'Shoulder' in t[2]])
-        camera = len([t for t in threats if 'Camera' in t[2]])
-        absence = len([t for t in threats if 'Absence' in t[2]])
+        self.newest_id = result['max_id']
+        if result['rows']:
+            if self.oldest_id is None:
+                self.oldest_id = result['rows'][-1][0]
+        
+        for threat_type, count in result['counts']:
+            self.type_counts[threat_type] += count
+        self.update_stats()
+    
+    def on_older_threats(self, rows):
+        self.older_pending = False
+        if rows is None:
+            return
+        for threat in rows:
+            self.insert_threat(threat, tk.END)
+        if rows:
+            self.oldest_id = rows[-1][0]
+        self.has_more = len(rows) == PAGE_SIZE
+    
+    def insert_threat(self, threat, index):
+        threat_id, timestamp, threat_type, face_count, _, _, action, screenshot, _, _ = threat
+        screenshot_display = os.path.basename(screenshot) if screenshot else "N/A"
+        self.tree.insert('', index, values=(
+            threat_id, timestamp, threat_type, face_count, action, screenshot_display
+        ))
+    
+    def update_stats(self):
+        """Stat cards from the aggregated per-type counts"""
+        counts = self.type_counts
+        total = sum(counts.values())
+        shoulder = sum(n for t, n in counts.items() if 'Shoulder' in t)
+        camera = sum(n for t, n in counts.items() if 'Camera' in t)
+        absence = sum(n for t, n in counts.items() if 'Absence' in t)
         
         self.stat_0.config(text=str(total))
         self.stat_1.config(text=str(shoulder))
         self.stat_2.config(text=str(camera))
         self.stat_3.config(text=str(absence))
-        
-        conn.close()
     
     def export_report(self):
-        """Export security report"""
-        if not os.path.exists('security_log.db'):
-            return
+        """Ask for format and filters, then export the report in the background"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Export Report")
+        dialog.configure(bg='#2e2e2e', padx=20, pady=20)
+        dialog.transient(self.root)
+        
+        fields = {}
+        options = [
+            ("Format", ttk.Combobox(dialog, values=sorted(FORMATS), state='readonly')),
+            ("Threat Type", ttk.Combobox(dialog, values=['All'] + sorted(self.type_counts), state='readonly')),
+            ("From (YYYY-MM-DD)", tk.Entry(dialog)),
+            ("To (YYYY-MM-DD)", tk.Entry(dialog)),
+        ]
+        for row, (label, widget) in enumerate(options):
+            tk.Label(dialog, text=label, font=('Arial', 11), bg='#2e2e2e', fg='white').grid(
+                row=row, column=0, sticky='w', pady=5)
+            widget.grid(row=row, column=1, sticky='ew', padx=(10, 0), pady=5)
+            fields[label] = widget
+        fields["Format"].set('txt')
+        fields["Threat Type"].set('All')
         
-        conn = sqlite3.connect('security_log.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM threats ORDER BY timestamp DESC')
-        threats = cursor.fetchall()
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'security_report_{timestamp}.txt'
-        
-        with open(filename, 'w') as f:
-            f.write("=" * 80 + "\n")
-            f.write("ZEROTRUST WORKSPACE GUARDIAN - SECURITY REPORT\n")
-            f.write("=" * 80 + "\n\n")
-            f.write(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total Threats Detected: {len(threats)}\n\n")
-            f.write("-" * 80 + "\n\n")
-            
-            for threat in threats:
-                f.write(f"Threat ID: {threat[0]}\n")
-                f.write(f"Timestamp: {threat[1]}\n")
-                f.write(f"Type: {threat[2]}\n")
-                f.write(f"Face Count: {threat[3]}\n")
-                f.write(f"Action Taken: {threat[4]}\n")
-                f.write(f"Evidence: {threat[5] or 'N/A'}\n")
-                f.write("-" * 80 + "\n\n")
-        
-        conn.close()
-        print(f"✅ Report exported: {filename}")
+        def start_export():
+            fmt = fields["Format"].get()
+            threat_type = fields["Threat Type"].get()
+            since = fields["From (YYYY-MM-DD)"].get().strip() or None
+            until = fields["To (YYYY-MM-DD)"].get().strip() or None
+            filename = default_filename(fmt)
+            dialog.destroy()
+            self.submit_query(self.query_export, self.on_exported, filename, fmt, since, until,
+                              None if threat_type == 'All' else threat_type)
+        
+        tk.Button(dialog, text="📊 Export", command=start_export,
+                  bg='#2196f3', fg='white', font=('Arial', 12, 'bold'),
+                  padx=20, pady=5, cursor='hand2').grid(row=len(options), column=0, columnspan=2, pady=(15, 0))
+    
+    def query_export(self, conn, filename, fmt, since, until, threat_type):
+        if conn is None:
+            return None
+        count = export_threats(conn, filename, fmt, since, until, threat_type)
+        return filename, count
+    
+    def on_exported(self, result):
+        if result:
+            filename, count = result
+            print(f"✅ Report exported: {filename} ({count} threats)")
     
     def clear_logs(self):
         """Clear all threat logs"""
-        if not os.path.exists('security_log.db'):
-            return
-        
-        conn = sqlite3.connect('security_log.db')
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM threats')
-        conn.commit()
-        conn.close()
-        
-        self.load_data()
-        print("✅ Logs cleared")
+        self.submit_query(self.query_clear, self.on_cleared)
+    
+    def on_cleared(self, result):
+        if result:
+            self.newest_id = None
+            self.load_data(full=True)
+            print("✅ Logs cleared")
     
     def auto_refresh(self):
         """Auto-refresh data every 5 seconds"""
@@ -0,0 +1,131 @@
+"""
+Evidence storage for ZeroTrust Workspace Guardian
+Encodes threat screenshots on a small worker pool, off the detection thread,
+and keeps the evidence directory within a file-count and byte budget.
+"""
+
+import itertools
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import cv2
+
+
+class EvidenceWriter:
+    EXTENSIONS = ('.jpg', '.jpeg', '.png', '.avi', '.mp4')
+
+    def __init__(self, directory, max_files=1000, max_bytes=None, workers=2, jpeg_quality=90):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.jpeg_quality = jpeg_quality
+        os.makedirs(directory, exist_ok=True)
+
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="EvidenceWriter")
+        self.lock = threading.Lock()
+        self.sequence = itertools.count()
+
+        # Oldest-first index of retained files; the directory is scanned only once, here
+        self.files = deque()
+        self.total_bytes = 0
+        self._scan()
+
+        # Counters
+        self.pending = 0
+        self.written = 0
+        self.failed = 0
+        self.evicted = 0
+
+        with self.lock:
+            self._enforce_retention()
+
+    def _scan(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.lower().endswith(self.EXTENSIONS):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        for _, path, size in sorted(entries):
+            self.files.append((path, size))
+            self.total_bytes += size
+
+    def new_path(self, threat_type, extension='.jpg', when=None):
+        """Collision-free evidence filename (millisecond timestamp + sequence number)"""
+        when = when or datetime.now()
+        stamp = when.strftime('%Y%m%d_%H%M%S_') + f"{when.microsecond // 1000:03d}"
+        return os.path.join(self.directory, f"{threat_type}_{stamp}_{next(self.sequence):04d}{extension}")
+
+    def save(self, frame, threat_type):
+        """Queue a frame for JPEG encoding and return the path it will be written to"""
+        path = self.new_path(threat_type)
+        # The caller keeps using its frame buffer, so encode from a private copy
+        self.submit(self._write_image, path, frame.copy())
+        return path
+
+    def submit(self, func, *args):
+        """Run a write job on the pool; func must return the written path or None"""
+        with self.lock:
+            self.pending += 1
+        self.executor.submit(self._run_job, func, *args)
+
+    def _run_job(self, func, *args):
+        try:
+            path = func(*args)
+        except Exception as e:
+            path = None
+            print(f"⚠️  Evidence write failed: {e}")
+        with self.lock:
+            self.pending -= 1
+            if path is None:
+                self.failed += 1
+                return
+            self.written += 1
+            self.add(path)
+
+    def _write_image(self, path, frame):
+        if not cv2.imwrite(path, frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]):
+            return None
+        return path
+
+    def add(self, path):
+        """Account for a newly written file and evict old ones if over budget (lock held)"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self.files.append((path, size))
+        self.total_bytes += size
+        self._enforce_retention()
+
+    def _enforce_retention(self):
+        while self.files and (
+            (self.max_files and len(self.files) > self.max_files)
+            or (self.max_bytes and self.total_bytes > self.max_bytes)
+        ):
+            path, size = self.files.popleft()
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️  Could not remove old evidence {path}: {e}")
+            self.total_bytes -= size
+            self.evicted += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'files': len(self.files),
+                'bytes': self.total_bytes,
+                'pending': self.pending,
+                'written': self.written,
+                'failed': self.failed,
+                'evicted': self.evicted,
+            }
+
+    def close(self):
+        """Finish queued writes"""
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,275 @@
+"""
+Face detection for ZeroTrust Workspace Guardian
+Interchangeable face-detector backends. Each one takes a FrameContext and
+returns (x, y, w, h) boxes:
+
+    haar          frontal Haar cascade (default), with an optional coarse-to-fine
+                  search: a fast pass on a downscaled frame finds candidate
+                  regions, then only those are checked at full resolution
+    haar_profile  frontal cascade plus the profile cascade on the frame and its
+                  mirror image, for faces turned sideways (shoulder surfers)
+    dnn           OpenCV DNN SSD face detector loaded from a local model file
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+# Smallest window the frontal-face Haar cascade was trained on
+CASCADE_WINDOW = 24
+
+HAAR_FRONTAL = os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
+HAAR_PROFILE = os.path.join(cv2.data.haarcascades, 'haarcascade_profileface.xml')
+
+BACKENDS = ('haar', 'haar_profile', 'dnn')
+
+
+def create_face_detector(backend='haar', cascade_options=None, dnn_options=None):
+    """Build the named backend; cascade_options apply to Haar, dnn_options to DNN"""
+    cascade_options = cascade_options or {}
+    if backend == 'haar':
+        return CascadeFaceDetector.from_file(HAAR_FRONTAL, **cascade_options)
+    if backend == 'haar_profile':
+        return ProfileFaceDetector.from_files(HAAR_FRONTAL, HAAR_PROFILE, **cascade_options)
+    if backend == 'dnn':
+        options = dict(dnn_options or {})
+        options.setdefault('min_size', cascade_options.get('min_size', (0, 0)))
+        options.setdefault('max_size', cascade_options.get('max_size'))
+        return DnnFaceDetector(**options)
+    raise ValueError(f"Unknown face detector backend: {backend} (choose from {', '.join(BACKENDS)})")
+
+
+def non_max_suppression(faces, iou_threshold=0.5):
+    """Remove duplicate/overlapping face detections using non-maximum suppression"""
+    if len(faces) == 0:
+        return []
+
+    # Convert to numpy array
+    boxes = np.array(faces)
+
+    # Calculate areas
+    x1 = boxes[:, 0]
+    y1 = boxes[:, 1]
+    x2 = boxes[:, 0] + boxes[:, 2]
+    y2 = boxes[:, 1] + boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+
+    # Sort by area (larger boxes first)
+    order = areas.argsort()[::-1]
+
+    keep = []
+    while len(order) > 0:
+        i = order[0]
+        keep.append(i)
+
+        if len(order) == 1:
+            break
+
+        # Calculate IoU with remaining boxes
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+
+        w = np.maximum(0, xx2 - xx1)
+        h = np.maximum(0, yy2 - yy1)
+
+        intersection = w * h
+        iou = intersection / (areas[i] + areas[order[1:]] - intersection + 1e-5)
+
+        # Keep only boxes with IoU below the threshold (not overlapping much)
+        order = order[1:][iou < iou_threshold]
+
+    return [tuple(boxes[i]) for i in keep]
+
+
+
+def merge_regions(regions):
+    """Merge overlapping [x1, y1, x2, y2] regions into their bounding boxes"""
+    merged = []
+    for region in sorted(regions):
+        for other in merged:
+            if region[0] < other[2] and other[0] < region[2] and region[1] < other[3] and other[1] < region[3]:
+                other[0] = min(other[0], region[0])
+                other[1] = min(other[1], region[1])
+                other[2] = max(other[2], region[2])
+                other[3] = max(other[3], region[3])
+                break
+        else:
+            merged.append(region)
+    return merged
+
+
+class CascadeFaceDetector:
+    def __init__(self, cascade, scale_factor=1.1, min_neighbors=6, min_size=(80, 80), max_size=(400, 400),
+                 coarse_to_fine=False, downscale_factor=2.0, coarse_scale_factor=1.2, roi_margin=0.3):
+        self.cascade = cascade
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = tuple(min_size)
+        self.max_size = tuple(max_size)
+        self.coarse_to_fine = coarse_to_fine and downscale_factor > 1.0
+        self.downscale_factor = downscale_factor
+        self.coarse_scale_factor = max(scale_factor, coarse_scale_factor)
+        self.roi_margin = roi_margin
+
+    @classmethod
+    def from_file(cls, path, **options):
+        """Load a cascade XML file (e.g. in a worker process) and wrap it"""
+        cascade = cv2.CascadeClassifier(path)
+        if cascade.empty():
+            raise IOError(f"Could not load face cascade: {path}")
+        return cls(cascade, **options)
+
+    def detect(self, context):
+        """Return face rectangles (x, y, w, h) in full-frame coordinates for a FrameContext"""
+        if self.coarse_to_fine:
+            return self.detect_coarse_to_fine(context.equalized, context.downscaled('equalized', self.downscale_factor))
+        return self.detect_full(context.equalized)
+
+    def detect_full(self, gray):
+        return self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=self.min_size,
+            maxSize=self.max_size,
+            flags=cv2.CASCADE_SCALE_IMAGE
+        )
+
+    def detect_coarse_to_fine(self, gray, small=None):
+        height, width = gray.shape[:2]
+        factor = self.downscale_factor
+        if small is None:
+            small = cv2.resize(gray, (int(width / factor), int(height / factor)), interpolation=cv2.INTER_AREA)
+
+        # Coarse pass: same face sizes, expressed in downscaled pixels. The cascade's cost
+        # is dominated by the number of pyramid levels, so this pass also takes bigger
+        # scale steps and needs fewer neighbours - it only proposes regions.
+        coarse_min = max(CASCADE_WINDOW, int(self.min_size[0] / factor))
+        coarse_max = max(coarse_min, int(self.max_size[0] / factor))
+        candidates = self.cascade.detectMultiScale(
+            small,
+            scaleFactor=self.coarse_scale_factor,
+            minNeighbors=max(1, self.min_neighbors // 3),
+            minSize=(coarse_min, coarse_min),
+            maxSize=(coarse_max, coarse_max),
+            flags=cv2.CASCADE_SCALE_IMAGE
+        )
+        if len(candidates) == 0:
+            return []
+
+        # Fine pass: full-resolution detection only inside the padded candidate regions
+        faces = []
+        for x1, y1, x2, y2 in self.candidate_regions(candidates, width, height):
+            roi = gray[y1:y2, x1:x2]
+            max_side = min(self.max_size[0], x2 - x1, y2 - y1)
+            if max_side < self.min_size[0]:
+                continue
+            found = self.cascade.detectMultiScale(
+                roi,
+                scaleFactor=self.scale_factor,
+                minNeighbors=self.min_neighbors,
+                minSize=self.min_size,
+                maxSize=(max_side, max_side),
+                flags=cv2.CASCADE_SCALE_IMAGE
+            )
+            for x, y, w, h in found:
+                faces.append((int(x) + x1, int(y) + y1, int(w), int(h)))
+        return faces
+
+    def candidate_regions(self, candidates, width, height):
+        """Scale coarse hits back up, pad them and merge any that overlap"""
+        factor = self.downscale_factor
+        regions = []
+        for x, y, w, h in candidates:
+            pad = max(w, h) * self.roi_margin
+            regions.append([
+                max(0, int((x - pad) * factor)),
+                max(0, int((y - pad) * factor)),
+                min(width, int((x + w + pad) * factor)),
+                min(height, int((y + h + pad) * factor)),
+            ])
+
+        return merge_regions(regions)
+
+
+class ProfileFaceDetector(CascadeFaceDetector):
+    """Frontal cascade plus the profile cascade, which only knows one side, run on the mirrored frame too"""
+
+    def __init__(self, cascade, profile_cascade=None, **options):
+        super().__init__(cascade, **options)
+        self.profile_cascade = profile_cascade
+
+    @classmethod
+    def from_files(cls, path, profile_path, **options):
+        profile_cascade = cv2.CascadeClassifier(profile_path)
+        if profile_cascade.empty():
+            raise IOError(f"Could not load profile cascade: {profile_path}")
+        return cls.from_file(path, profile_cascade=profile_cascade, **options)
+
+    def detect(self, context):
+        # Overlapping frontal/profile hits are merged later by non-maximum suppression
+        faces = [tuple(int(v) for v in face) for face in super().detect(context)]
+        gray = context.equalized
+        width = gray.shape[1]
+        for image, mirrored in ((gray, False), (cv2.flip(gray, 1), True)):
+            found = self.profile_cascade.detectMultiScale(
+                image,
+                scaleFactor=self.scale_factor,
+                minNeighbors=self.min_neighbors,
+                minSize=self.min_size,
+                maxSize=self.max_size,
+                flags=cv2.CASCADE_SCALE_IMAGE
+            )
+            for x, y, w, h in found:
+                faces.append((int(width - x - w) if mirrored else int(x), int(y), int(w), int(h)))
+        return faces
+
+
+class DnnFaceDetector:
+    """
+    SSD face detector through cv2.dnn, e.g. res10_300x300_ssd_iter_140000.caffemodel
+    with deploy.prototxt, or opencv_face_detector_uint8.pb with its .pbtxt
+    """
+
+    def __init__(self, model, config=None, confidence=0.6, input_size=(300, 300), mean=(104.0, 177.0, 123.0),
+                 threads=None, min_size=(0, 0), max_size=None):
+        if not os.path.exists(model):
+            raise IOError(f"Face model not found: {model}")
+        self.net = cv2.dnn.readNet(model, config or '')
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        if threads:
+            # OpenCV's thread pool is process-wide, so this also applies to the other detectors
+            cv2.setNumThreads(threads)
+        self.confidence = confidence
+        self.input_size = tuple(input_size)
+        self.mean = tuple(mean)
+        self.min_size = tuple(min_size)
+        self.max_size = tuple(max_size) if max_size else None
+
+    def detect(self, context):
+        return self.detect_batch([context.frame])[0]
+
+    def detect_batch(self, frames):
+        """One forward pass for several BGR frames; returns a box list per frame"""
+        blob = cv2.dnn.blobFromImages(frames, 1.0, self.input_size, self.mean, swapRB=False, crop=False)
+        self.net.setInput(blob)
+        # Rows: image index, class, confidence, x1, y1, x2, y2 (coordinates relative to the image)
+        detections = self.net.forward().reshape(-1, 7)
+        detections = detections[detections[:, 2] >= self.confidence]
+
+        results = [[] for _ in frames]
+        for image_id, _, _, x1, y1, x2, y2 in detections:
+            height, width = frames[int(image_id)].shape[:2]
+            x1, x2 = np.clip((x1 * width, x2 * width), 0, width)
+            y1, y2 = np.clip((y1 * height, y2 * height), 0, height)
+            w, h = int(x2 - x1), int(y2 - y1)
+            if w < self.min_size[0] or h < self.min_size[1]:
+                continue
+            if self.max_size and (w > self.max_size[0] or h > self.max_size[1]):
+                continue
+            results[int(image_id)].append((int(x1), int(y1), w, h))
+        return results
@@ -0,0 +1,90 @@
+"""
+Shared per-frame preprocessing for ZeroTrust Workspace Guardian
+A FrameContext hands detectors the derived images they need (grayscale,
+equalized, blurred, edge maps, downscaled copies). Each one is computed lazily,
+at most once per frame, into buffers that are reused from frame to frame.
+
+Buffers are overwritten by the next frame: copy anything you keep longer.
+"""
+
+import cv2
+import numpy as np
+
+
+class FrameContext:
+    def __init__(self, blur_kernel=(5, 5), canny_thresholds=(30, 100)):
+        self.blur_kernel = tuple(blur_kernel)
+        self.canny_thresholds = tuple(canny_thresholds)
+        self.morph_kernel = np.ones((3, 3), np.uint8)
+
+        self.frame = None
+        self.buffers = {}
+        self.ready = set()
+
+    def reset(self, frame):
+        """Start a new frame; previously derived images become stale"""
+        self.frame = frame
+        self.ready.clear()
+        return self
+
+    @property
+    def shape(self):
+        return self.frame.shape[:2]
+
+    def _buffer(self, key, shape):
+        buffer = self.buffers.get(key)
+        if buffer is None or buffer.shape != shape:
+            buffer = self.buffers[key] = np.empty(shape, np.uint8)
+        return buffer
+
+    def _get(self, key, build):
+        buffer = self.buffers.get(key)
+        if key not in self.ready:
+            buffer = build()
+            self.ready.add(key)
+        return buffer
+
+    @property
+    def gray(self):
+        return self._get('gray', lambda: cv2.cvtColor(
+            self.frame, cv2.COLOR_BGR2GRAY, dst=self._buffer('gray', self.shape)))
+
+    @property
+    def equalized(self):
+        """Histogram-equalized grayscale (better contrast for face detection)"""
+        return self._get('equalized', lambda: cv2.equalizeHist(
+            self.gray, dst=self._buffer('equalized', self.shape)))
+
+    @property
+    def blurred(self):
+        return self._get('blurred', lambda: cv2.GaussianBlur(
+            self.gray, self.blur_kernel, 0, dst=self._buffer('blurred', self.shape)))
+
+    @property
+    def edges(self):
+        low, high = self.canny_thresholds
+        return self._get('edges', lambda: cv2.Canny(
+            self.blurred, low, high, edges=self._buffer('edges', self.shape)))
+
+    @property
+    def closed_edges(self):
+        """Edges dilated then eroded, joining small gaps in outlines"""
+        def build():
+            dilated = cv2.dilate(self.edges, self.morph_kernel, dst=self._buffer('dilated', self.shape),
+                                 iterations=1)
+            return cv2.erode(dilated, self.morph_kernel, dst=self._buffer('closed_edges', self.shape),
+                             iterations=1)
+        return self._get('closed_edges', build)
+
+    def resized(self, source, size):
+        """gray or equalized image resized to size (width, height) with area averaging"""
+        size = tuple(int(v) for v in size)
+        key = (source, size)
+        return self._get(key, lambda: cv2.resize(
+            getattr(self, source), size, dst=self._buffer(key, (size[1], size[0])),
+            interpolation=cv2.INTER_AREA))
+
+    def downscaled(self, source, factor):
+        """Pyramid level: gray or equalized image shrunk by factor"""
+        height, width = self.shape
+        return self.resized(source, (int(width / factor), int(height / factor)))
@@ -1,53 +1,275 @@
-import cv2
-import pyautogui
 import time
-import sqlite3
-import os
+IMPORT_STARTED = time.perf_counter()  # Start of the startup profile (--profile-startup)
+import argparse
+import importlib
+import threading
+from contextlib import contextmanager
+from functools import partial
 from datetime import datetime
-from collections import deque
-from PIL import Image, ImageTk, ImageFilter
+import cv2
 import numpy as np
 import config  # Import configuration
+from capture import CameraOpener, FrameGrabber
+from config_watch import ConfigWatcher
+from clip_buffer import ClipRecorder
+from evidence import EvidenceWriter
+from face_detection import create_face_detector, non_max_suppression
+from frame_context import FrameContext
+from metrics import guardian_metrics, start_metrics_server
+from motion import MotionGate
+from phone_detection import PhoneDetector
+from pipeline import Pipeline
+from stabilizer import StreamingStabilizer
+from storage import ThreatWriter
+from telemetry import TelemetryStore
+from threat_state import (ABSENCE_STARTED, CAMERA, FACE_LOST, RESTORE, SHOULDER_SURFING, USER_ABSENCE,
+                          ThreatStateMachine)
+from tracker import FaceTracker
+IMPORTS_FINISHED = time.perf_counter()
+
+# What the guardian logs and does for each confirmed threat
+THREAT_RESPONSES = {
+    SHOULDER_SURFING: {'label': 'Shoulder Surfing', 'action_taken': 'Screen Minimized', 'evidence': True,
+                       'message': "🚨 SHOULDER SURFING CONFIRMED! ({faces} faces detected)"},
+    CAMERA: {'label': 'Camera/Phone Recording', 'action_taken': 'Screen Minimized', 'evidence': True,
+             'message': "🚨 CAMERA/PHONE RECORDING CONFIRMED!"},
+    USER_ABSENCE: {'label': 'User Absence', 'action_taken': 'Screen Locked (Simulated)', 'evidence': False,
+                   'message': "🚨 USER ABSENT FOR {seconds}s - AUTO LOCKING"},
+}
+
+
+def preload_module(name):
+    """Import a module on a background thread so its first real use does not stall"""
+    def load():
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass  # Reported where the module is actually used
+    thread = threading.Thread(target=load, name=f"Preload-{name}", daemon=True)
+    thread.start()
+    return thread
+
+
+def face_detector_options():
+    """CascadeFaceDetector settings shared by every place that builds one"""
+    settings = config.FACE_DETECTION
+    return dict(
+        scale_factor=settings['scaleFactor'],
+        min_neighbors=settings['minNeighbors'],  # Higher = fewer false positives
+        min_size=tuple(settings['minSize']),
+        max_size=tuple(settings['maxSize']),
+        coarse_to_fine=settings.get('coarse_to_fine', False),
+        downscale_factor=settings.get('downscale_factor', 2.0),
+        coarse_scale_factor=settings.get('coarse_scale_factor', 1.2),
+    )
+
+
+def dnn_detector_options():
+    """DnnFaceDetector settings (only used with FACE_DETECTION['backend'] = 'dnn')"""
+    return dict(
+        model=config.FACE_DETECTION.get('dnn_model'),
+        config=config.FACE_DETECTION.get('dnn_config'),
+        confidence=config.FACE_DETECTION.get('dnn_confidence', 0.6),
+        input_size=config.FACE_DETECTION.get('dnn_input_size', (300, 300)),
+        threads=config.FACE_DETECTION.get('threads'),
+    )
+
+
+def face_detector_factory():
+    """Picklable zero-argument builder for the configured face backend (worker processes use it too)"""
+    return partial(create_face_detector, config.FACE_DETECTION.get('backend', 'haar'),
+                   face_detector_options(), dnn_detector_options())
+
+
+def build_detectors():
+    """A (face, phone) detector pair; one pair can serve several cameras, one frame at a time"""
+    face_detector = face_detector_factory()()
+    # Phone/camera shape detector (thresholds read from config once)
+    phone_detector = PhoneDetector.from_config(config.CAMERA_DETECTION)
+    return face_detector, phone_detector
+
+
+def open_threat_writer(database_path):
+    """Start the background writer for threat logging"""
+    return ThreatWriter(
+        database_path,
+        batch_size=config.LOGGING.get('write_batch_size', 50),
+        flush_interval=config.LOGGING.get('write_flush_interval', 0.5),
+    )
+
+
+def open_evidence_writer(directory):
+    """Evidence writer with the configured retention budget"""
+    max_mb = config.LOGGING.get('max_evidence_mb')
+    return EvidenceWriter(
+        directory,
+        max_files=config.LOGGING['max_screenshots'],
+        max_bytes=max_mb * 1024 * 1024 if max_mb else None,
+        workers=config.LOGGING.get('evidence_workers', 2),
+        jpeg_quality=config.LOGGING.get('jpeg_quality', 90),
+    )
+
 
 class ZeroTrustGuardian:
-    def __init__(self):
-        # Initialize database
-        self.init_database()
+    def __init__(self, source=None, headless=False, database_path='security_log.db', evidence_dir=None,
+                 telemetry_path=None, camera_index=None, name=None, threat_writer=None, evidence_writer=None,
+                 detectors=None, screen=None, display=None, render_overlay=None):
+        # Headless mode: no window, no real screen actions (used for replay)
+        self.headless = headless
+        if display is None:
+            display = config.DISPLAY['show_feed'] and not headless
+        self.display = display
         
-        # Load face detector (single, most reliable one)
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
+        # Camera name when several are monitored from one process (multicam.py)
+        self.name = name
+        
+        # Writers and detectors may be shared with other cameras; only close (or rebuild) what we own
+        self.owns_threat_writer = threat_writer is None
+        self.owns_evidence_writer = evidence_writer is None
+        self.owns_detectors = detectors is None
+        
+        # Screen actions go through a shared coordinator when several cameras guard one screen
+        self.screen = screen
+        
+        # Startup phases (name, start, end, background) and when the first frame was protected
+        self.startup_phases = []
+        self.protected_at = None
+        
+        # Open webcam with configured settings, unless a recorded source was given.
+        # The driver negotiates on a background thread while everything below loads.
+        self.grabber = None
+        threaded_capture = source is None and config.PERFORMANCE.get('threaded_capture', True)
+        camera_opener = None
+        if source is not None:
+            self.cap = source
+        else:
+            if camera_index is None:
+                camera_index = config.PERFORMANCE['camera_index']
+            camera_opener = CameraOpener(
+                camera_index,
+                config.PERFORMANCE['frame_width'],
+                config.PERFORMANCE['frame_height'],
+                buffer_size=1 if threaded_capture else None,
+            )
         
-        # Open webcam with configured settings
-        self.cap = cv2.VideoCapture(config.PERFORMANCE['camera_index'])
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.PERFORMANCE['frame_width'])
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.PERFORMANCE['frame_height'])
+        # Initialize database
+        with self.startup_phase('threat_log'):
+            if threat_writer is not None:
+                self.threat_writer = threat_writer
+            else:
+                self.init_database(database_path)
+        
+        # Load the configured face detector backend (Haar cascade by default)
+        with self.startup_phase('detectors'):
+            if detectors is not None:
+                self.face_detector, self.phone_detector = detectors
+            else:
+                self.face_detector, self.phone_detector = build_detectors()
         
         # State management from config
-        self.face_history = deque(maxlen=config.STABILIZATION['face_history_length'])
-        self.phone_history = deque(maxlen=config.STABILIZATION['phone_history_length'])
-        self.privacy_mode = False
-        self.last_action_time = 0
-        self.ACTION_COOLDOWN = config.SHOULDER_SURFING['cooldown_seconds']
+        self.face_history = StreamingStabilizer(
+            config.STABILIZATION['face_history_length'],
+            config.STABILIZATION.get('face_history_seconds'),
+        )
+        self.phone_history = StreamingStabilizer(
+            config.STABILIZATION['phone_history_length'],
+            config.STABILIZATION.get('phone_history_seconds'),
+        )
+        # Confirmation, cooldown and grace periods run on observation time, not frame counts
+        self.threats = ThreatStateMachine.from_config(config)
         self.threat_count = 0
-        self.user_absent_time = None
-        self.ABSENCE_THRESHOLD = config.USER_ABSENCE['threshold_seconds']
-        self.last_threat_type = None
-        self.consecutive_threats = 0
-        self.THREAT_CONFIRMATION_THRESHOLD = config.SHOULDER_SURFING['confirmation_threshold']
         
-        # Additional tracking for stability
-        self.last_known_face_count = 1  # Assume user starts alone
-        self.face_lost_time = None
-        self.FACE_LOST_GRACE_PERIOD = 2.0  # seconds before considering face truly lost
+        # Motion gating: reuse the last detections while the scene is static
+        self.motion_gate = self.build_motion_gate()
+        self.last_faces = None
+        self.last_phone_detection = False
+        self.last_phone_boxes = []
+        
+        # Track faces between detections so identities stay stable
+        self.tracker = self.build_tracker()
         
         # Test mode
-        self.test_mode = config.ADVANCED['test_mode']
+        self.test_mode = config.ADVANCED['test_mode'] or headless
+        
+        # Evidence writer (headless runs only save evidence when given a directory)
+        self.capture_evidence = config.LOGGING['capture_screenshots'] and (evidence_dir is not None or not headless)
+        self.evidence_writer = evidence_writer
+        if self.capture_evidence and evidence_writer is None:
+            with self.startup_phase('evidence_writer'):
+                self.evidence_writer = open_evidence_writer(evidence_dir or config.LOGGING['screenshot_dir'])
+        
+        # Last few seconds of frames, saved as a clip (plus post-roll) when a threat needs evidence
+        self.clip_recorder = None
+        if self.evidence_writer is not None and config.LOGGING.get('save_clips', False):
+            self.clip_recorder = ClipRecorder.from_config(self.evidence_writer, config.LOGGING)
+        
+        # Per-frame telemetry (headless runs only record it when given a database)
+        self.telemetry = None
+        if config.TELEMETRY['enabled'] and (telemetry_path is not None or not headless):
+            with self.startup_phase('telemetry'):
+                self.telemetry = self.open_telemetry(telemetry_path or config.TELEMETRY['database_path'])
+        
+        # Threats logged while processing the current frame
+        self.frame_events = []
+        
+        # Counters for the metrics endpoint: frames each detector ran on, and found something
+        self.detector_runs = {'face': 0, 'phone': 0}
+        self.detector_hits = {'face': 0, 'phone': 0}
+        self.last_decision = None
+        
+        # Optionally run face and phone detection side by side in worker processes
+        self.detector_pool = None
+        if detectors is None and config.PERFORMANCE.get('parallel_detectors', False):
+            from parallel import ParallelDetectors  # multiprocessing is only loaded when used
+            self.detector_pool = ParallelDetectors(self.detector_specs(), config.PERFORMANCE.get('detector_workers'))
         
-        # Create screenshots directory
-        os.makedirs('threat_logs', exist_ok=True)
+        # Grayscale, edges and downscaled copies, built once per frame and shared by all detectors
+        self.frame_context = FrameContext()
         
+        # Overlay: drawn on a copy of the frame, only when it will be seen, at most refresh_hz times a second.
+        # multicam.py shows the windows itself and asks for the overlay without a window.
+        self.render_overlay = self.display if render_overlay is None else render_overlay
+        refresh_hz = config.DISPLAY.get('refresh_hz', 30)
+        self.render_interval = 1.0 / refresh_hz if refresh_hz else 0.0
+        self.last_render = 0.0
+        self.overlay_frame = None
+        self.overlays_rendered = 0
+        
+        # Named processing stages with per-stage timing
+        self.build_pipeline()
+        
+        # Optional metrics endpoint (multicam.py serves one for all its cameras)
+        self.metrics_server = None
+        if source is None and name is None:
+            self.metrics_server = start_metrics_server(lambda: guardian_metrics([self]))
+        
+        # Apply config.py edits while running (live camera only; replays keep their settings).
+        # multicam.py shares detectors between cameras and does not reload.
+        self.config_watcher = None
+        if source is None and name is None and config.ADVANCED.get('live_reload', True):
+            self.config_watcher = ConfigWatcher(config.ADVANCED.get('reload_interval', 1.0))
+        
+        if camera_opener is not None:
+            # First-call allocations (and worker start-up) happen now, not on the first frame
+            with self.startup_phase('warm_up'):
+                self.warm_up((config.PERFORMANCE['frame_height'], config.PERFORMANCE['frame_width'], 3))
+            
+            # Responses import pyautogui on first use; load it while the camera finishes opening
+            if not self.test_mode:
+                preload_module('pyautogui')
+            
+            with self.startup_phase('camera_wait'):
+                self.cap = camera_opener.result()
+            self.startup_phases.append(('camera_open', camera_opener.started, camera_opener.finished, True))
+        
+        # Grab frames on a separate thread so detection never works on a stale backlog
+        if threaded_capture:
+            self.grabber = FrameGrabber(self.cap, config.PERFORMANCE.get('capture_buffer_size', 2)).start()
+        
+        if name is None:
+            self.print_banner()
+    
+    def print_banner(self):
         print("🛡️  ZeroTrust Workspace Guardian Active")
         print(f"📊 Monitoring: Shoulder Surfing | Screen Recording | User Absence")
         print(f"🔒 Privacy Mode: Local Processing Only")
@@ -55,130 +277,187 @@ class ZeroTrustGuardian:
         if self.test_mode:
             print("🧪 TEST MODE: Actions simulated only")
         
-    def init_database(self):
-        """Initialize SQLite database for threat logging"""
-        self.conn = sqlite3.connect('security_log.db')
-        self.cursor = self.conn.cursor()
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS threats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT,
-                threat_type TEXT,
-                face_count INTEGER,
-                action_taken TEXT,
-                screenshot_path TEXT,
-                location TEXT
-            )
-        ''')
-        self.conn.commit()
-    
-    def log_threat(self, threat_type, face_count, action_taken, screenshot_path=None):
-        """Log security threat to database"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        self.cursor.execute('''
-            INSERT INTO threats (timestamp, threat_type, face_count, action_taken, screenshot_path, location)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (timestamp, threat_type, face_count, action_taken, screenshot_path, 'Unknown'))
-        self.conn.commit()
+    def init_database(self, database_path='security_log.db'):
+        """Start the background writer for threat logging"""
+        self.threat_writer = open_threat_writer(database_path)
+    
+    def open_telemetry(self, database_path):
+        """Start the background telemetry store with the configured retention"""
+        settings = config.TELEMETRY
+        retention = {}
+        for tier, key, seconds in (('samples', 'keep_samples_hours', 3600), ('1s', 'keep_1s_hours', 3600),
+                                   ('1m', 'keep_1m_days', 86400), ('1h', 'keep_1h_days', 86400)):
+            keep = settings.get(key)
+            retention[tier] = keep * seconds if keep is not None else None
+        return TelemetryStore(
+            database_path,
+            sample_rate=settings.get('sample_rate', 5),
+            flush_interval=settings.get('flush_interval', 1.0),
+            retention=retention,
+        )
+    
+    def build_motion_gate(self):
+        if not config.MOTION_GATING['enabled']:
+            return None
+        return MotionGate(
+            config.MOTION_GATING['grid_size'],
+            config.MOTION_GATING['pixel_threshold'],
+            config.MOTION_GATING['changed_fraction'],
+            config.MOTION_GATING['max_reuse_ms'],
+        )
+    
+    def build_tracker(self):
+        if not config.FACE_TRACKING['enabled']:
+            return None
+        return FaceTracker(
+            config.FACE_TRACKING['detect_interval'],
+            config.FACE_TRACKING['iou_threshold'],
+            config.FACE_TRACKING['max_missed'],
+        )
+    
+    def apply_config(self, changed):
+        """Rebuild only what the changed config sections affect; capture and history carry on"""
+        kept = set()  # Sections whose new settings could not be applied
+        if 'STABILIZATION' in changed:
+            settings = config.STABILIZATION
+            self.face_history.resize(settings['face_history_length'], settings.get('face_history_seconds'))
+            self.phone_history.resize(settings['phone_history_length'], settings.get('phone_history_seconds'))
+        
+        if changed & {'SHOULDER_SURFING', 'CAMERA_DETECTION', 'USER_ABSENCE', 'STABILIZATION'}:
+            self.threats.configure(config)
+        
+        if changed & {'FACE_DETECTION', 'CAMERA_DETECTION'} and self.owns_detectors:
+            try:
+                detectors = build_detectors()
+            except (OSError, ValueError, KeyError, cv2.error) as e:
+                # e.g. a DNN backend whose model file is missing: keep protecting with what works
+                print(f"⚠️  Detector settings not applied, kept previous settings: {e}")
+                kept = changed & {'FACE_DETECTION', 'CAMERA_DETECTION'}
+            else:
+                self.face_detector, self.phone_detector = detectors
+                if self.detector_pool is not None:
+                    # New workers load in the background; the current ones detect until they are ready
+                    self.detector_pool.restart(self.detector_specs())
+                # Detections made with the old settings must not be reused
+                if self.motion_gate is not None:
+                    self.motion_gate.reset()
+        
+        if 'MOTION_GATING' in changed:
+            self.motion_gate = self.build_motion_gate()
+        
+        if 'FACE_TRACKING' in changed:
+            settings = config.FACE_TRACKING
+            if self.tracker is not None and settings['enabled']:
+                # Keep the current tracks (and the USER identity)
+                self.tracker.detect_interval = max(1, settings['detect_interval'])
+                self.tracker.iou_threshold = settings['iou_threshold']
+                self.tracker.max_missed = settings['max_missed']
+            else:
+                self.tracker = self.build_tracker()
+        
+        restart = changed & {'PERFORMANCE', 'LOGGING', 'TELEMETRY'}
+        
+        if 'DISPLAY' in changed:
+            refresh_hz = config.DISPLAY.get('refresh_hz', 30)
+            self.render_interval = 1.0 / refresh_hz if refresh_hz else 0.0
+            # The window and the overlay stage are set up at start
+            if (config.DISPLAY['show_feed'] and not self.headless) != self.display:
+                restart.add("DISPLAY['show_feed']")
+        
+        if 'METRICS' in changed and self.name is None:
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+            self.metrics_server = start_metrics_server(lambda: guardian_metrics([self]))
+        
+        if 'ADVANCED' in changed:
+            self.test_mode = config.ADVANCED['test_mode'] or self.headless
+        
+        reloaded = changed - kept - restart
+        if reloaded:
+            print(f"🔄 Config reloaded: {', '.join(sorted(reloaded))}")
+        if restart:
+            print(f"⚠️  Restart to apply: {', '.join(sorted(restart))}")
+    
+    @contextmanager
+    def startup_phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_phases.append((name, start, time.perf_counter(), False))
+    
+    def warm_up(self, shape):
+        """Run the detectors once on a blank frame of the expected shape"""
+        blank = np.zeros(shape, np.uint8)
+        if self.detector_pool is not None:
+            self.detector_pool.start(shape)
+        context = self.frame_context.reset(blank)
+        self.face_detector.detect(context)
+        if config.CAMERA_DETECTION['enabled']:
+            self.phone_detector.detect(context)
+    
+    def format_startup_profile(self):
+        """Startup phases up to the first protected frame, from the start of guardian.py's imports"""
+        phases = [('imports', IMPORT_STARTED, IMPORTS_FINISHED, False)] + self.startup_phases
+        lines = [f"⏱️  Time to first protected frame: {(self.protected_at - IMPORT_STARTED) * 1000:.0f} ms",
+                 f"{'Phase':<18}{'start ms':>10}{'ms':>9}"]
+        for name, start, end, background in sorted(phases, key=lambda phase: phase[1]):
+            label = f"{name} (bg)" if background else name
+            lines.append(f"{label:<18}{(start - IMPORT_STARTED) * 1000:>10.0f}{(end - start) * 1000:>9.1f}")
+        return "\n".join(lines)
+    
+    @property
+    def privacy_mode(self):
+        return self.threats.privacy_mode
+    
+    def detector_specs(self):
+        """How worker processes rebuild each detector: (name, factory, args)"""
+        return [
+            ('face', face_detector_factory(), ()),
+            ('phone', PhoneDetector.from_config, (config.CAMERA_DETECTION,)),
+        ]
+    
+    def log_threat(self, threat_type, face_count, action_taken, screenshot_path=None,
+                   stable_face_count=None, confidence=None, clip_path=None):
+        """Log security threat to database (queued, never blocks the frame loop)"""
+        now = datetime.now()
+        timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
+        self.threat_writer.log((int(now.timestamp() * 1000), threat_type, face_count, stable_face_count,
+                                confidence, action_taken, screenshot_path, clip_path))
         self.threat_count += 1
-        print(f"🚨 THREAT #{self.threat_count}: {threat_type} detected at {timestamp}")
+        self.frame_events.append(threat_type)
+        where = f" on {self.name}" if self.name else ""
+        print(f"🚨 THREAT #{self.threat_count}: {threat_type} detected{where} at {timestamp}")
     
     def capture_threat_screenshot(self, frame, threat_type):
-        """Save screenshot of threat"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'threat_logs/{threat_type}_{timestamp}.jpg'
-        cv2.imwrite(filename, frame)
-        return filename
+        """Save screenshot of threat (encoded in the background)"""
+        if self.evidence_writer is None:
+            return None
+        return self.evidence_writer.save(frame, threat_type)
     
     def remove_overlapping_faces(self, faces):
         """Remove duplicate/overlapping face detections using non-maximum suppression"""
-        if len(faces) == 0:
-            return []
-        
-        # Convert to numpy array
-        boxes = np.array(faces)
-        
-        # Calculate areas
-        x1 = boxes[:, 0]
-        y1 = boxes[:, 1]
-        x2 = boxes[:, 0] + boxes[:, 2]
-        y2 = boxes[:, 1] + boxes[:, 3]
-        areas = (x2 - x1) * (y2 - y1)
-        
-        # Sort by area (larger boxes first)
-        order = areas.argsort()[::-1]
-        
-        keep = []
-        while len(order) > 0:
-            i = order[0]
-            keep.append(i)
-            
-            if len(order) == 1:
-                break
-            
-            # Calculate IoU with remaining boxes
-            xx1 = np.maximum(x1[i], x1[order[1:]])
-            yy1 = np.maximum(y1[i], y1[order[1:]])
-            xx2 = np.minimum(x2[i], x2[order[1:]])
-            yy2 = np.minimum(y2[i], y2[order[1:]])
-            
-            w = np.maximum(0, xx2 - xx1)
-            h = np.maximum(0, yy2 - yy1)
-            
-            intersection = w * h
-            iou = intersection / (areas[i] + areas[order[1:]] - intersection + 1e-5)
-            
-            # Keep only boxes with IoU < 0.5 (not overlapping much)
-            order = order[1:][iou < 0.5]
-        
-        return [tuple(boxes[i]) for i in keep]
+        return non_max_suppression(faces)
     
-    def detect_phone_camera(self, frame):
+    def detect_phone_camera(self, frame, current_time=None, context=None, faces=None, phone_boxes=None):
         """Detect rectangular objects that might be phones/cameras - improved accuracy"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Preprocessing for better edge detection
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        edges = cv2.Canny(blurred, 30, 100)
-        
-        # Morphological operations to connect edges
-        kernel = np.ones((3, 3), np.uint8)
-        edges = cv2.dilate(edges, kernel, iterations=1)
-        edges = cv2.erode(edges, kernel, iterations=1)
-        
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if phone_boxes is None:
+            if context is None:
+                context = FrameContext().reset(frame)
+            phone_boxes = self.phone_detector.detect(context, faces)
+        # Boxes are drawn by the overlay stage, never on the analysed frame
+        self.last_phone_boxes = phone_boxes
         
-        phone_detected = False
-        
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            
-            # Filter by size
-            if config.CAMERA_DETECTION['min_area'] < area < config.CAMERA_DETECTION['max_area']:
-                x, y, w, h = cv2.boundingRect(contour)
-                aspect_ratio = float(w) / h if h > 0 else 0
-                
-                # Check aspect ratios
-                portrait_min, portrait_max = config.CAMERA_DETECTION['aspect_ratios']['portrait']
-                landscape_min, landscape_max = config.CAMERA_DETECTION['aspect_ratios']['landscape']
-                
-                is_portrait = portrait_min < aspect_ratio < portrait_max
-                is_landscape = landscape_min < aspect_ratio < landscape_max
-                
-                if is_portrait or is_landscape:
-                    # Verify it's rectangular (4-8 corners)
-                    perimeter = cv2.arcLength(contour, True)
-                    approx = cv2.approxPolyDP(contour, 0.04 * perimeter, True)
-                    
-                    if 4 <= len(approx) <= 8:
-                        cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 0, 255), 2)
-                        cv2.putText(frame, "CAMERA", (x, y-10),
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
-                        phone_detected = True
-        
-        # Stabilization: require consistent detection
-        self.phone_history.append(1 if phone_detected else 0)
-        stable_detection = sum(self.phone_history) >= len(self.phone_history) * 0.5
+        phone_detected = len(phone_boxes) > 0
+        self.last_phone_detection = phone_detected
+        self.detector_runs['phone'] += 1
+        self.detector_hits['phone'] += phone_detected
+        return self.stabilize_phone_detection(phone_detected, current_time)
+    
+    def stabilize_phone_detection(self, phone_detected, current_time=None):
+        """Stabilization: require consistent detection"""
+        self.phone_history.update(1 if phone_detected else 0, current_time)
+        stable_detection = self.phone_history.ratio() >= 0.5
         
         return stable_detection
     
@@ -189,272 +468,415 @@ class ZeroTrustGuardian:
             return
         # In production, this would overlay a blur on the actual screen
         # For demo, we'll just minimize
-        pyautogui.hotkey('win', 'd')
+        self.press_hotkey('win', 'd')
+    
+    def restore_screen(self):
+        """Bring the minimized windows back"""
+        if self.test_mode:
+            print("   [TEST MODE] Would restore screen")
+            return
+        self.press_hotkey('win', 'd')
     
     def lock_screen(self):
         """Lock the computer"""
         if self.test_mode:
             print("   [TEST MODE] Would lock screen")
             return
-        pyautogui.hotkey('win', 'l')
+        self.press_hotkey('win', 'l')
     
-    def run(self):
-        """Main monitoring loop"""
-        while True:
-            ret, frame = self.cap.read()
-            if not ret:
-                break
-            
-            # Convert to grayscale for face detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Enhance image quality for better detection
-            gray = cv2.equalizeHist(gray)  # Improve contrast
-            
-            # Primary face detection (most reliable)
-            faces = self.face_cascade.detectMultiScale(
-                gray, 
-                scaleFactor=1.1,
-                minNeighbors=6,  # Higher = fewer false positives
-                minSize=(80, 80),  # Larger minimum to avoid small false detections
-                maxSize=(400, 400),
-                flags=cv2.CASCADE_SCALE_IMAGE
-            )
-            
-            # Remove overlapping detections (non-maximum suppression)
-            if len(faces) > 0:
-                faces = self.remove_overlapping_faces(list(faces))
-            
-            face_count = len(faces)
-            
-            # Add to history for stabilization
-            self.face_history.append(face_count)
-            
-            # Use median instead of average for better stability
-            sorted_history = sorted(self.face_history)
-            median_idx = len(sorted_history) // 2
-            stable_face_count = sorted_history[median_idx]
-            
-            # Calculate confidence based on consistency
-            face_consistency = sum(1 for f in self.face_history if f == stable_face_count) / len(self.face_history)
-            
-            # Draw face boxes with labels
-            for i, (x, y, w, h) in enumerate(faces):
-                color = (0, 255, 0) if face_count == 1 else (0, 0, 255)
-                cv2.rectangle(frame, (x, y), (x+w, y+h), color, 3)
-                
-                # Label each face
-                label = "USER" if i == 0 and face_count == 1 else f"PERSON {i+1}"
-                cv2.putText(frame, label, (x, y-10),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-            
+    def press_hotkey(self, *keys):
+        """Send a key combination to the desktop"""
+        # Imported here so headless replay works on machines without a display
+        import pyautogui
+        pyautogui.hotkey(*keys)
+    
+    def read_frame(self):
+        """Read the next frame from the capture thread or source"""
+        with self.pipeline.timed('capture'):
+            if self.grabber is not None:
+                return self.grabber.read()
+            return self.cap.read()
+    
+    def build_pipeline(self):
+        """Assemble the per-frame processing stages"""
+        self.pipeline = Pipeline(config.PERFORMANCE.get('timing_window', 300))
+        self.pipeline.histogram('capture')
+        self.pipeline.add_stage('preprocess', self.preprocess_stage)
+        self.pipeline.add_stage('motion_gate', self.motion_gate_stage)
+        self.pipeline.add_stage('face_detect', self.face_detect_stage)
+        self.pipeline.add_stage('nms', self.nms_stage)
+        self.pipeline.add_stage('phone_detect', self.phone_detect_stage)
+        self.pipeline.add_stage('decide', self.decide_stage)
+        if self.clip_recorder is not None:
+            self.pipeline.add_stage('clip', self.clip_stage)
+        self.pipeline.add_stage('act', self.act_stage)
+        if self.render_overlay:
+            self.pipeline.add_stage('render', self.render_stage)
+        if self.detector_pool is not None:
+            self.pipeline.add_stage('parallel_detect', self.parallel_detect_stage, before='face_detect')
+    
+    def process_frame(self, frame, current_time=None):
+        """Run detection and threat logic on one frame and return the decision"""
+        if current_time is None:
             current_time = time.time()
-            
-            # THREAT 1: Multiple faces (Shoulder Surfing) - with confirmation
-            if config.SHOULDER_SURFING['enabled'] and stable_face_count > 1 and face_consistency > config.STABILIZATION['consistency_threshold']:
-                if self.last_threat_type == "shoulder_surfing":
-                    self.consecutive_threats += 1
-                else:
-                    self.last_threat_type = "shoulder_surfing"
-                    self.consecutive_threats = 1
-                
-                if not self.privacy_mode and self.consecutive_threats >= self.THREAT_CONFIRMATION_THRESHOLD:
-                    if (current_time - self.last_action_time) > self.ACTION_COOLDOWN:
-                        print(f"🚨 SHOULDER SURFING CONFIRMED! ({face_count} faces detected)")
-                        screenshot = self.capture_threat_screenshot(frame, "shoulder_surfing")
-                        self.log_threat("Shoulder Surfing", face_count, "Screen Minimized", screenshot)
-                        self.blur_screen()
-                        self.privacy_mode = True
-                        self.last_action_time = current_time
-                        self.consecutive_threats = 0
-                    
-                cv2.putText(frame, f"THREAT: SHOULDER SURFING ({self.consecutive_threats}/{self.THREAT_CONFIRMATION_THRESHOLD})", 
-                           (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        self.frame_events = []
+        
+        state = {
+            'frame': frame,
+            'time': current_time,
+            'faces': [],
+            'tracks': None,  # Face tracks when tracking is enabled
+            'face_count': 0,
+            'phone_detected': False,
+            'phone_boxes': [],
+            'reused': False,  # Detection results carried over from the last changed frame
+            'tracked': False,  # Face detection skipped; tracks predicted instead
+            'detected': {},   # Results from the parallel detector pool, by detector name
+            'actions': [],   # Responses queued by decide, carried out by act
+            'notices': [],   # Status lines for the overlay
+            'absence': None,
+        }
+        self.pipeline.run(state)
+        
+        if self.telemetry is not None:
+            self.telemetry.record(current_time, state['face_count'], state['stable_face_count'],
+                                  state['face_consistency'], self.last_phone_detection, state['phone_detected'],
+                                  self.privacy_mode, state['latency_ns'] / 1e6)
+        
+        self.last_decision = {
+            'face_count': state['face_count'],
+            'stable_face_count': state['stable_face_count'],
+            'face_consistency': state['face_consistency'],
+            'phone_detected': bool(state['phone_detected']),
+            'privacy_mode': self.privacy_mode,
+            'reused': state['reused'],
+            'events': self.frame_events,
+        }
+        return self.last_decision
+    
+    def preprocess_stage(self, state):
+        """Point the shared frame context at this frame; detectors derive what they need from it"""
+        state['context'] = self.frame_context.reset(state['frame'])
+    
+    def motion_gate_stage(self, state):
+        """Skip detection when the scene has not changed since the last detected frame"""
+        if self.tracker is not None and not self.tracker.detection_due():
+            state['tracked'] = True
+            return
+        if self.motion_gate is not None and self.last_faces is not None:
+            state['reused'] = not self.motion_gate.needs_detection(state['context'], state['time'])
+    
+    def parallel_detect_stage(self, state):
+        """Run this frame's detectors concurrently in the worker pool"""
+        requests = {}
+        if not state['tracked'] and not state['reused']:
+            requests['face'] = ()
+        if config.CAMERA_DETECTION['enabled'] and not state['reused']:
+            # This frame's faces are not known yet; phone ROIs use the last detection
+            requests['phone'] = (self.last_faces,)
+        # A single detector gains nothing from the pool; it runs inline in its own stage
+        if len(requests) > 1:
+            state['detected'] = self.detector_pool.detect(state['frame'], requests)
+    
+    def face_detect_stage(self, state):
+        """Primary face detection (most reliable)"""
+        if state['tracked']:
+            return
+        if state['reused']:
+            state['faces'] = self.last_faces
+            return
+        if 'face' in state['detected']:
+            state['faces'] = state['detected']['face']
+            return
+        state['faces'] = self.face_detector.detect(state['context'])
+    
+    def nms_stage(self, state):
+        """Remove overlapping detections (non-maximum suppression), then update the tracks"""
+        faces = state['faces']
+        if not state['tracked']:
+            if not state['reused']:
+                self.detector_runs['face'] += 1
+                if len(faces) > 0:
+                    self.detector_hits['face'] += 1
+                    faces = self.remove_overlapping_faces(list(faces))
+            self.last_faces = faces
+        
+        if self.tracker is not None:
+            if state['tracked'] or state['reused']:
+                tracks = self.tracker.predict(state['time'])
             else:
-                if self.last_threat_type == "shoulder_surfing":
-                    self.consecutive_threats = 0
-                    self.last_threat_type = None
-            
-            # THREAT 2: Phone/Camera detection - with confirmation
-            if config.CAMERA_DETECTION['enabled']:
-                phone_detected = self.detect_phone_camera(frame)
-            if phone_detected and not self.privacy_mode:
-                if self.last_threat_type == "camera":
-                    self.consecutive_threats += 1
-                else:
-                    self.last_threat_type = "camera"
-                    self.consecutive_threats = 1
-                
-                if self.consecutive_threats >= self.THREAT_CONFIRMATION_THRESHOLD:
-                    if (current_time - self.last_action_time) > self.ACTION_COOLDOWN:
-                        print("🚨 CAMERA/PHONE RECORDING CONFIRMED!")
-                        screenshot = self.capture_threat_screenshot(frame, "camera_detected")
-                        self.log_threat("Camera/Phone Recording", face_count, "Screen Minimized", screenshot)
-                        self.blur_screen()
-                        self.privacy_mode = True
-                        self.last_action_time = current_time
-                        self.consecutive_threats = 0
-                
-                cv2.putText(frame, f"THREAT: CAMERA DETECTED ({self.consecutive_threats}/{self.THREAT_CONFIRMATION_THRESHOLD})", 
-                           (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            elif not phone_detected and self.last_threat_type == "camera":
-                self.consecutive_threats = 0
-                self.last_threat_type = None
-            
-            # SAFE: Exactly 1 face with good consistency
-            if stable_face_count == 1 and face_consistency > config.STABILIZATION['consistency_threshold']:
-                self.user_absent_time = None  # Reset absence timer
-                self.face_lost_time = None  # Reset face lost timer
-                self.last_known_face_count = 1
-                
-                # Reset threat counters when safe
-                if self.last_threat_type in ["shoulder_surfing", "camera"]:
-                    self.consecutive_threats = max(0, self.consecutive_threats - 1)
-                
-                if self.privacy_mode and (current_time - self.last_action_time) > self.ACTION_COOLDOWN:
-                    print("✅ Safe - Resuming (1 face detected consistently)")
-                    pyautogui.hotkey('win', 'd')
-                    self.privacy_mode = False
-                    self.last_action_time = current_time
-                    self.last_threat_type = None
-                    self.consecutive_threats = 0
-            
-            # Handle temporary face loss (movement, rotation)
-            elif stable_face_count == 0:
-                if self.last_known_face_count == 1:
-                    # Face was just detected, might be temporary loss
-                    if self.face_lost_time is None:
-                        self.face_lost_time = current_time
-                        print("⚠️  Face temporarily lost - grace period active...")
-                    
-                    time_lost = current_time - self.face_lost_time
-                    
-                    # Within grace period - don't trigger absence
-                    if time_lost < self.FACE_LOST_GRACE_PERIOD:
-                        cv2.putText(frame, f"Face Lost: {time_lost:.1f}s / {self.FACE_LOST_GRACE_PERIOD}s grace", 
-                                   (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 165, 0), 2)
-                        # Don't start absence timer yet
-                        continue_to_absence = False
-                    else:
-                        # Grace period expired, now consider truly absent
-                        continue_to_absence = True
-                else:
-                    continue_to_absence = True
-                
-                if continue_to_absence and config.USER_ABSENCE['enabled'] and face_consistency > config.STABILIZATION['consistency_threshold']:
-                    if self.user_absent_time is None:
-                        self.user_absent_time = current_time
-                        print("⚠️  User absence detected - monitoring...")
-                    
-                    absent_duration = int(current_time - self.user_absent_time)
-                    
-                    if absent_duration > self.ABSENCE_THRESHOLD:
-                        if not self.privacy_mode:
-                            print(f"🚨 USER ABSENT FOR {absent_duration}s - AUTO LOCKING")
-                            self.log_threat("User Absence", 0, "Screen Locked (Simulated)", None)
-                            self.blur_screen()
-                            self.privacy_mode = True
-                            self.last_action_time = current_time
-                    
-                    # Visual warning
-                    warning_color = (0, 165, 255) if absent_duration < self.ABSENCE_THRESHOLD else (0, 0, 255)
-                    cv2.putText(frame, f"User Absent: {absent_duration}s / {self.ABSENCE_THRESHOLD}s", 
-                               (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.6, warning_color, 2)
-                    
-                    # Progress bar
-                    progress = min(absent_duration / self.ABSENCE_THRESHOLD, 1.0)
-                    bar_width = int(300 * progress)
-                    cv2.rectangle(frame, (10, 130), (310, 145), (100, 100, 100), -1)
-                    cv2.rectangle(frame, (10, 130), (10 + bar_width, 145), warning_color, -1)
+                tracks = self.tracker.update(faces, state['time'])
+            state['tracks'] = tracks
+            faces = self.tracker.boxes(tracks, state['time'])
+        
+        state['faces'] = faces
+        state['face_count'] = len(faces)
+    
+    def phone_detect_stage(self, state):
+        """Phone/camera shape detection"""
+        if config.CAMERA_DETECTION['enabled']:
+            if state['reused']:
+                state['phone_detected'] = self.stabilize_phone_detection(self.last_phone_detection, state['time'])
             else:
-                # Multiple faces or other count
-                self.face_lost_time = None
-                if stable_face_count > 0:
-                    self.last_known_face_count = stable_face_count
-                    self.user_absent_time = None
-                    self.last_action_time = current_time
-                    self.last_threat_type = None
-                    self.consecutive_threats = 0
+                state['phone_detected'] = self.detect_phone_camera(state['frame'], state['time'],
+                                                                   state['context'], state['faces'],
+                                                                   state['detected'].get('phone'))
+            state['phone_boxes'] = self.last_phone_boxes
+    
+    def decide_stage(self, state):
+        """Stabilize counts, update threat state and queue any responses"""
+        current_time = state['time']
+        face_count = state['face_count']
+        phone_detected = state['phone_detected']
+        actions = state['actions']
+        notices = state['notices']
+        
+        # Add to history for stabilization
+        self.face_history.update(face_count, current_time)
+        
+        # Use median instead of average for better stability
+        stable_face_count = self.face_history.median()
+        
+        # Calculate confidence based on consistency
+        face_consistency = self.face_history.consistency(stable_face_count)
+        
+        state['stable_face_count'] = stable_face_count
+        state['face_consistency'] = face_consistency
+        
+        threats = self.threats
+        for transition in threats.update(current_time, stable_face_count, face_consistency, phone_detected):
+            if transition == FACE_LOST:
+                print("⚠️  Face temporarily lost - grace period active...")
+            elif transition == ABSENCE_STARTED:
+                print("⚠️  User absence detected - monitoring...")
+            elif transition == RESTORE:
+                print("✅ Safe - Resuming (1 face detected consistently)")
+                actions.append({'response': 'restore'})
+            else:
+                response = THREAT_RESPONSES[transition]
+                count = 0 if transition == USER_ABSENCE else face_count
+                print(response['message'].format(faces=count, seconds=int(threats.absent_for(current_time) or 0)))
+                # Switch the response to 'lock' to actually lock; for demo, just minimize
+                actions.append({'response': 'blur', 'threat_type': transition, 'label': response['label'],
+                                'face_count': count, 'action_taken': response['action_taken'],
+                                'evidence': response['evidence']})
+        
+        # Progress of threats that are building up
+        if threats.shoulder_surfing.since is not None:
+            notices.append((f"THREAT: SHOULDER SURFING ({threats.shoulder_surfing.elapsed(current_time):.1f}s"
+                            f"/{threats.shoulder_surfing.confirm_seconds}s)", 60, 0.7, (0, 0, 255)))
+        if threats.camera.since is not None and not threats.privacy_mode:
+            notices.append((f"THREAT: CAMERA DETECTED ({threats.camera.elapsed(current_time):.1f}s"
+                            f"/{threats.camera.confirm_seconds}s)", 90, 0.7, (0, 0, 255)))
+        
+        time_lost = threats.face_lost_for(current_time)
+        if time_lost is not None and time_lost < threats.grace_seconds:
+            notices.append((f"Face Lost: {time_lost:.1f}s / {threats.grace_seconds}s grace",
+                            90, 0.6, (255, 165, 0)))
+        absent_for = threats.absent_for(current_time)
+        if absent_for is not None and threats.absence_enabled:
+            state['absence'] = int(absent_for)
+    
+    def clip_stage(self, state):
+        """Copy the frame into the pre-event ring and hand over clips whose post-roll is complete"""
+        self.clip_recorder.record(state['frame'], state['time'])
+    
+    def act_stage(self, state):
+        """Carry out queued responses: evidence, logging, screen actions"""
+        for action in state['actions']:
+            if 'label' in action:
+                screenshot = None
+                clip = None
+                if action['evidence']:
+                    screenshot = self.capture_threat_screenshot(state['frame'], action['threat_type'])
+                    if self.clip_recorder is not None:
+                        clip = self.clip_recorder.trigger(action['threat_type'], state['time'])
+                self.log_threat(action['label'], action['face_count'], action['action_taken'], screenshot,
+                                state['stable_face_count'], state['face_consistency'], clip)
             
-            # THREAT 3: User absence - with grace period
-            if config.USER_ABSENCE['enabled'] and stable_face_count == 0 and face_consistency > config.STABILIZATION['consistency_threshold']:
-                if continue_to_absence:
-                    # THREAT 3: User absence - with grace period
-                    if config.USER_ABSENCE['enabled'] and face_consistency > config.STABILIZATION['consistency_threshold']:
-                        if self.user_absent_time is None:
-                            self.user_absent_time = current_time
-                            print("⚠️  User absence detected - monitoring...")
-                        
-                        absent_duration = int(current_time - self.user_absent_time)
-                        
-                        if absent_duration > self.ABSENCE_THRESHOLD:
-                            if not self.privacy_mode:
-                                print(f"🚨 USER ABSENT FOR {absent_duration}s - AUTO LOCKING")
-                                self.log_threat("User Absence", 0, "Screen Locked (Simulated)", None)
-                                # Uncomment to actually lock:
-                                # self.lock_screen()
-                                self.blur_screen()  # For demo, just minimize
-                                self.privacy_mode = True
-                                self.last_action_time = current_time
-                        
-                        # Visual warning
-                        warning_color = (0, 165, 255) if absent_duration < self.ABSENCE_THRESHOLD else (0, 0, 255)
-                        cv2.putText(frame, f"User Absent: {absent_duration}s / {self.ABSENCE_THRESHOLD}s", 
-                                   (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.6, warning_color, 2)
-                        
-                        # Progress bar
-                        progress = min(absent_duration / self.ABSENCE_THRESHOLD, 1.0)
-                        bar_width = int(300 * progress)
-                        cv2.rectangle(frame, (10, 130), (310, 145), (100, 100, 100), -1)
-                        cv2.rectangle(frame, (10, 130), (10 + bar_width, 145), warning_color, -1)
+            if self.screen is not None:
+                self.screen.respond(self, action['response'])
+            elif action['response'] == 'blur':
+                self.blur_screen()
+            elif action['response'] == 'lock':
+                self.lock_screen()
+            elif action['response'] == 'restore':
+                self.restore_screen()
+    
+    def render_stage(self, state):
+        """Draw the status overlay on a copy of the frame and show the feed"""
+        now = time.perf_counter()
+        if now - self.last_render < self.render_interval:
+            return
+        self.last_render = now
+        
+        # The analysed frame stays clean for evidence; draw on a reused copy
+        if self.overlay_frame is None or self.overlay_frame.shape != state['frame'].shape:
+            self.overlay_frame = np.empty_like(state['frame'])
+        np.copyto(self.overlay_frame, state['frame'])
+        frame = self.overlay_frame
+        faces = state['faces']
+        face_count = state['face_count']
+        stable_face_count = state['stable_face_count']
+        current_time = state['time']
+        
+        # Draw face boxes with labels
+        for i, (x, y, w, h) in enumerate(faces):
+            color = (0, 255, 0) if face_count == 1 else (0, 0, 255)
+            cv2.rectangle(frame, (x, y), (x+w, y+h), color, 3)
+            
+            # Label each face (tracked faces keep their identity across frames)
+            if state['tracks'] is not None:
+                label = state['tracks'][i].label
             else:
-                # Multiple faces or other count
-                self.face_lost_time = None
-                if stable_face_count > 0:
-                    self.last_known_face_count = stable_face_count
-                    self.user_absent_time = None
+                label = "USER" if i == 0 and face_count == 1 else f"PERSON {i+1}"
+            cv2.putText(frame, label, (x, y-10),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        
+        # Phone/camera candidates
+        for x, y, w, h in state['phone_boxes']:
+            cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 0, 255), 2)
+            cv2.putText(frame, "CAMERA", (x, y-10),
+                      cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+        
+        # Threat and grace-period notices
+        for text, y, scale, color in state['notices']:
+            cv2.putText(frame, text, (10, y), cv2.FONT_HERSHEY_SIMPLEX, scale, color, 2)
+        
+        if state['absence'] is not None:
+            absent_duration = state['absence']
             
-            # Display status with confidence
-            status_color = (0, 255, 0) if stable_face_count == 1 else (0, 0, 255)
-            confidence_pct = int(face_consistency * 100)
-            cv2.putText(frame, f"Faces: {face_count} | Stable: {stable_face_count} | Confidence: {confidence_pct}%", 
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, status_color, 2)
+            # Visual warning
+            warning_color = (0, 165, 255) if absent_duration < self.threats.absence_seconds else (0, 0, 255)
+            cv2.putText(frame, f"User Absent: {absent_duration}s / {self.threats.absence_seconds}s", 
+                       (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.6, warning_color, 2)
             
-            # Privacy mode indicator
-            if self.privacy_mode:
-                # Flashing red banner
-                if int(current_time * 2) % 2 == 0:
-                    cv2.rectangle(frame, (0, 160), (frame.shape[1], 200), (0, 0, 255), -1)
-                    cv2.putText(frame, "PRIVACY MODE ACTIVE - SCREEN PROTECTED", (10, 185),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            # Progress bar
+            progress = min(absent_duration / self.threats.absence_seconds, 1.0)
+            bar_width = int(300 * progress)
+            cv2.rectangle(frame, (10, 130), (310, 145), (100, 100, 100), -1)
+            cv2.rectangle(frame, (10, 130), (10 + bar_width, 145), warning_color, -1)
+        
+        # Display status with confidence
+        status_color = (0, 255, 0) if stable_face_count == 1 else (0, 0, 255)
+        confidence_pct = int(state['face_consistency'] * 100)
+        cv2.putText(frame, f"Faces: {face_count} | Stable: {stable_face_count} | Confidence: {confidence_pct}%", 
+                   (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, status_color, 2)
+        
+        # Privacy mode indicator
+        if self.privacy_mode:
+            # Flashing red banner
+            if int(current_time * 2) % 2 == 0:
+                cv2.rectangle(frame, (0, 160), (frame.shape[1], 200), (0, 0, 255), -1)
+                cv2.putText(frame, "PRIVACY MODE ACTIVE - SCREEN PROTECTED", (10, 185),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        
+        # Threat counter
+        cv2.putText(frame, f"Total Threats Logged: {self.threat_count}", (10, 220),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+        
+        # System status
+        status_text = "MONITORING" if not self.privacy_mode else "PROTECTED"
+        status_bg_color = (0, 100, 0) if not self.privacy_mode else (0, 0, 100)
+        cv2.rectangle(frame, (frame.shape[1]-200, 10), (frame.shape[1]-10, 50), status_bg_color, -1)
+        cv2.putText(frame, status_text, (frame.shape[1]-190, 35),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        
+        self.overlays_rendered += 1
+        
+        # Show feed if configured
+        if self.display:
+            cv2.imshow(config.DISPLAY['window_name'], frame)
+    
+    def run(self, profile_startup=False):
+        """Main monitoring loop"""
+        waiting = time.perf_counter()
+        try:
+            while True:
+                ret, frame = self.read_frame()
+                if not ret:
+                    break
             
-            # Threat counter
-            cv2.putText(frame, f"Total Threats Logged: {self.threat_count}", (10, 220),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+                frame_read = time.perf_counter()
+                self.process_frame(frame)
             
-            # System status
-            status_text = "MONITORING" if not self.privacy_mode else "PROTECTED"
-            status_bg_color = (0, 100, 0) if not self.privacy_mode else (0, 0, 100)
-            cv2.rectangle(frame, (frame.shape[1]-200, 10), (frame.shape[1]-10, 50), status_bg_color, -1)
-            cv2.putText(frame, status_text, (frame.shape[1]-190, 35),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                if self.protected_at is None:
+                    # Threat decisions (and any response) for the first frame are done
+                    self.protected_at = time.perf_counter()
+                    self.startup_phases.append(('first_frame', waiting, frame_read, False))
+                    self.startup_phases.append(('first_decision', frame_read, self.protected_at, False))
+                    if profile_startup:
+                        print(self.format_startup_profile())
             
-            # Show feed if configured
-            if config.DISPLAY['show_feed']:
-                cv2.imshow(config.DISPLAY['window_name'], frame)
+                # The grabber keeps capturing while changed settings are applied
+                if self.config_watcher is not None:
+                    changed = self.config_watcher.poll()
+                    if changed:
+                        self.apply_config(changed)
             
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
-        
-        self.cleanup()
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                if key == ord('t'):
+                    # Print live stage timings
+                    print(self.pipeline.format_report())
+        finally:
+            # Writers are flushed and threads stopped however the loop ends
+            self.cleanup()
     
     def cleanup(self):
         """Clean up resources"""
+        if self.name:
+            print(f"── {self.name} ──")
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        if self.grabber is not None:
+            self.grabber.stop()
+            stats = self.grabber.stats()
+            print(f"📷 Frames: {stats['grabbed']} grabbed | {stats['processed']} processed | {stats['dropped']} dropped")
+        if self.detector_pool is not None:
+            stats = self.detector_pool.stats()
+            print(f"⚡ Parallel detection: {stats['frames']} frames on {stats['workers']} workers | "
+                  f"p95 {stats['gather_p95_ms']:.1f}ms")
+            self.detector_pool.close()
+        if self.tracker is not None:
+            stats = self.tracker.stats()
+            print(f"👥 Tracking: {stats['detections']} detection passes | {stats['predictions']} predicted frames")
+        if self.motion_gate is not None:
+            stats = self.motion_gate.stats()
+            print(f"🎞️  Detection: {stats['recomputed']} recomputed | {stats['reused']} reused ({stats['reuse_ratio']:.0%})")
         self.cap.release()
-        cv2.destroyAllWindows()
-        self.conn.close()
-        print("🛡️  Guardian deactivated")
+        if self.display:
+            cv2.destroyAllWindows()
+        if not self.headless:
+            print(self.pipeline.format_report())
+        if config.PERFORMANCE.get('timing_report'):
+            self.pipeline.dump(config.PERFORMANCE['timing_report'])
+        if self.clip_recorder is not None:
+            # Clips still in their post-roll are written with what was recorded so far
+            self.clip_recorder.flush()
+            stats = self.clip_recorder.stats()
+            print(f"🎬 Clips: {stats['clips']} saved | {stats['failed']} failed | "
+                  f"buffer {stats['buffer_bytes'] / 1024 / 1024:.1f} MB")
+        if self.evidence_writer is not None and self.owns_evidence_writer:
+            self.evidence_writer.close()
+            stats = self.evidence_writer.stats()
+            print(f"🖼️  Evidence: {stats['files']} files ({stats['bytes'] / 1024 / 1024:.1f} MB) | {stats['evicted']} evicted")
+        if self.telemetry is not None:
+            self.telemetry.close()
+            stats = self.telemetry.stats()
+            print(f"📈 Telemetry: {stats['written']} samples from {stats['frames']} frames | {stats['pruned']} rows pruned")
+        if self.owns_threat_writer:
+            self.threat_writer.close()
+            stats = self.threat_writer.stats()
+            print(f"💾 Threat log: {stats['written']} written in {stats['commits']} commits | "
+                  f"max queue {stats['max_queue_depth']} | commit p95 {stats['commit_p95_ms']:.1f}ms")
+            print("🛡️  Guardian deactivated")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ZeroTrust Workspace Guardian")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Print where the time to the first protected frame went")
+    args = parser.parse_args()
     guardian = ZeroTrustGuardian()
-    guardian.run()
+    guardian.run(profile_startup=args.profile_startup)
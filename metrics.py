@@ -0,0 +1,213 @@
+"""
+Metrics endpoint for ZeroTrust Workspace Guardian
+Serves the guardian's performance counters over HTTP in the Prometheus text
+format (fps, per-stage latency histograms, dropped frames, detector hit rates,
+threat state, pending writes and process memory), so fleet monitoring can
+scrape every workstation and alert when a guardian falls behind its frame budget.
+
+Values are read from the running guardians at scrape time; nothing is added
+to the frame loop. The server listens on localhost unless configured otherwise.
+
+Usage (config.py):
+    METRICS = {'enabled': True, 'host': '127.0.0.1', 'port': 9464}
+    curl http://127.0.0.1:9464/metrics
+"""
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def process_memory_bytes():
+    """Resident memory of this process (peak resident memory where only that is available)"""
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+                    'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        if ctypes.windll.psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters),
+                                                    counters.cb):
+            return counters.WorkingSetSize
+        return 0
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # macOS reports bytes, Linux KiB
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + '}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def format_metrics(families):
+    """Text exposition of (name, type, help, [(sample name, labels, value)]) families"""
+    lines = []
+    for name, kind, help_text, samples in families:
+        if not samples:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for sample, labels, value in samples:
+            lines.append(f"{sample}{format_labels(labels)} {format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def guardian_metrics(guardians):
+    """Metric families for one or more guardians (labelled by camera name when they have one)"""
+    families = {}
+
+    def add(name, kind, help_text, value, labels=None, sample=None):
+        family = families.setdefault(name, (name, kind, help_text, []))
+        family[3].append((sample or name, labels or {}, value))
+
+    for guardian in guardians:
+        camera = {'camera': guardian.name} if guardian.name else {}
+        pipeline = guardian.pipeline
+        add('guardian_fps', 'gauge', "Frames processed per second (recent window)", pipeline.fps(), camera)
+        add('guardian_frames_total', 'counter', "Frames processed", pipeline.histogram('total').count, camera)
+        dropped = guardian.grabber.stats()['dropped'] if guardian.grabber is not None else 0
+        add('guardian_frames_dropped_total', 'counter', "Camera frames replaced by a newer one before processing",
+            dropped, camera)
+
+        for stage, histogram in list(pipeline.histograms.items()):
+            labels = dict(camera, stage=stage)
+            name = 'guardian_stage_latency_seconds'
+            help_text = "Time spent per frame in each pipeline stage ('total' is the whole frame)"
+            for bound, count in histogram.buckets():
+                le = '+Inf' if bound == float('inf') else format_value(bound / 1000)
+                add(name, 'histogram', help_text, count, dict(labels, le=le), f"{name}_bucket")
+            add(name, 'histogram', help_text, histogram.total_ns / 1e9, labels, f"{name}_sum")
+            add(name, 'histogram', help_text, histogram.count, labels, f"{name}_count")
+
+        for detector in ('face', 'phone'):
+            labels = dict(camera, detector=detector)
+            runs = guardian.detector_runs[detector]
+            hits = guardian.detector_hits[detector]
+            add('guardian_detector_runs_total', 'counter', "Frames each detector actually ran on", runs, labels)
+            add('guardian_detector_hits_total', 'counter', "Detector runs that found something", hits, labels)
+            add('guardian_detector_hit_ratio', 'gauge', "Share of detector runs that found something",
+                hits / runs if runs else 0.0, labels)
+
+        decision = guardian.last_decision or {}
+        add('guardian_stable_face_count', 'gauge', "Stabilized number of faces in view",
+            decision.get('stable_face_count', 0), camera)
+        add('guardian_privacy_mode', 'gauge', "1 while the screen is protected", guardian.privacy_mode, camera)
+        add('guardian_threats_total', 'counter', "Threats logged", guardian.threat_count, camera)
+
+    # Writers can be shared between cameras: count each queue once
+    pending = {'threat_log': {}, 'evidence': {}, 'telemetry': {}}
+    for guardian in guardians:
+        pending['threat_log'][id(guardian.threat_writer)] = guardian.threat_writer.pending()
+        if guardian.evidence_writer is not None:
+            pending['evidence'][id(guardian.evidence_writer)] = guardian.evidence_writer.stats()['pending']
+        if guardian.telemetry is not None:
+            pending['telemetry'][id(guardian.telemetry)] = guardian.telemetry.stats()['pending']
+    for queue, writers in pending.items():
+        add('guardian_pending_writes', 'gauge', "Queued writes not yet on disk", sum(writers.values()),
+            {'queue': queue})
+
+    fps_limit = config.PERFORMANCE.get('fps_limit')
+    if fps_limit:
+        add('guardian_target_fps', 'gauge', "Configured frame budget (PERFORMANCE['fps_limit'])", fps_limit)
+    add('process_resident_memory_bytes', 'gauge', "Resident memory size in bytes", process_memory_bytes())
+    return format_metrics(families.values())
+
+
+class MetricsServer:
+    """HTTP endpoint serving collect() (a function returning the exposition text) on /metrics"""
+
+    def __init__(self, collect, host='127.0.0.1', port=9464):
+        self.collect = collect
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+        self.scrapes = 0
+
+    def start(self):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                try:
+                    body = metrics.collect().encode('utf-8')
+                except Exception as e:
+                    self.send_error(500, str(e))
+                    return
+                metrics.scrapes += 1
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes every few seconds would flood the console
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="MetricsServer", daemon=True)
+        self.thread.start()
+        return self
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            self.thread = None
+
+
+def start_metrics_server(collect):
+    """Start the endpoint configured in config.METRICS; None if disabled or the port is taken"""
+    settings = getattr(config, 'METRICS', {})
+    if not settings.get('enabled', False):
+        return None
+    try:
+        server = MetricsServer(collect, settings.get('host', '127.0.0.1'), settings.get('port', 9464)).start()
+    except OSError as e:
+        print(f"⚠️  Metrics endpoint not started: {e}")
+        return None
+    print(f"📈 Metrics: {server.url}")
+    return server
@@ -0,0 +1,61 @@
+"""
+Motion gating for ZeroTrust Workspace Guardian
+Compares a tiny thumbnail of each frame with the one from the last full
+detection, so static scenes can reuse the previous detection results.
+"""
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    def __init__(self, grid_size=(32, 24), pixel_threshold=12, changed_fraction=0.01, max_reuse_ms=500):
+        self.grid_size = tuple(grid_size)
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.max_reuse = max_reuse_ms / 1000.0
+
+        self.reference = None
+        self.reference_time = None
+
+        # Counters
+        self.recomputed = 0
+        self.reused = 0
+
+    def needs_detection(self, context, current_time):
+        """True if the frame (a FrameContext) must go through full detection"""
+        thumbnail = context.resized('gray', self.grid_size)
+
+        if self.reference is None or current_time - self.reference_time >= self.max_reuse:
+            return self._refresh(thumbnail, current_time)
+
+        # Compare against the last detected frame, not the previous one, so slow drift still adds up
+        diff = cv2.absdiff(thumbnail, self.reference)
+        changed = cv2.countNonZero(cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)[1])
+        if changed > self.changed_fraction * diff.size:
+            return self._refresh(thumbnail, current_time)
+
+        self.reused += 1
+        return False
+
+    def _refresh(self, thumbnail, current_time):
+        # The context reuses its buffers next frame, so keep a copy
+        if self.reference is None:
+            self.reference = thumbnail.copy()
+        else:
+            np.copyto(self.reference, thumbnail)
+        self.reference_time = current_time
+        self.recomputed += 1
+        return True
+
+    def reset(self):
+        """Force full detection on the next frame"""
+        self.reference = None
+
+    def stats(self):
+        total = self.recomputed + self.reused
+        return {
+            'recomputed': self.recomputed,
+            'reused': self.reused,
+            'reuse_ratio': self.reused / total if total else 0.0,
+        }
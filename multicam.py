@@ -0,0 +1,268 @@
+"""
+Multi-camera monitoring for ZeroTrust Workspace Guardian
+One process watches several cameras (front + side, or several seats). Every
+camera keeps its own threat state, stabilizers and tracker, while the detectors,
+threat log and evidence writer are shared. A small pool of worker threads -
+one detector pair each - takes cameras in round-robin order, so every camera
+gets its turn and no detector is ever used by two threads at once.
+
+Usage:
+    python multicam.py 0 1
+    python multicam.py front.mp4 side.mp4 --headless
+"""
+
+import argparse
+import os
+import threading
+import time
+
+import cv2
+
+import config
+from capture import open_source
+from guardian import ZeroTrustGuardian, build_detectors, open_evidence_writer, open_threat_writer
+from metrics import guardian_metrics, start_metrics_server
+
+
+class SharedScreen:
+    """One screen guarded by several cameras: protect on the first alarm, restore once all are clear"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.protecting = set()
+
+    def respond(self, guardian, response):
+        with self.lock:
+            if response in ('blur', 'lock'):
+                already_protected = bool(self.protecting)
+                self.protecting.add(guardian.name)
+                if response == 'lock':
+                    guardian.lock_screen()
+                elif not already_protected:
+                    guardian.blur_screen()
+            elif response == 'restore' and guardian.name in self.protecting:
+                self.protecting.discard(guardian.name)
+                if not self.protecting:
+                    guardian.restore_screen()
+
+
+class Camera:
+    """Scheduling state for one camera's guardian"""
+
+    def __init__(self, guardian, recorded=False):
+        self.guardian = guardian
+        self.recorded = recorded  # Video file / image directory: decide on recording time
+        self.busy = False
+        self.finished = False
+        self.frames = 0
+        self.latest_frame = None
+        self.overlays_shown = 0
+        self.started = time.perf_counter()
+
+
+class MultiCameraGuardian:
+    def __init__(self, sources, workers=None, headless=False, database_path=None, evidence_dir=None):
+        self.headless = headless
+        self.display = config.DISPLAY['show_feed'] and not headless
+
+        database_path = database_path or config.LOGGING['database_path']
+        self.threat_writer = open_threat_writer(database_path)
+        self.evidence_writer = None
+        if config.LOGGING['capture_screenshots'] and (evidence_dir is not None or not headless):
+            self.evidence_writer = open_evidence_writer(evidence_dir or config.LOGGING['screenshot_dir'])
+        self.screen = SharedScreen()
+
+        # One detector pair per worker thread, however many cameras there are
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(sources)))
+        self.detector_sets = [build_detectors() for _ in range(self.workers)]
+
+        telemetry_base, telemetry_ext = os.path.splitext(config.TELEMETRY['database_path'])
+        self.cameras = []
+        for i, source in enumerate(sources):
+            name = f"cam{i}"
+            recorded = not isinstance(source, int)
+            guardian = ZeroTrustGuardian(
+                source=open_source(source) if recorded else None,
+                camera_index=source if not recorded else None,
+                headless=headless,
+                database_path=database_path,
+                evidence_dir=evidence_dir,
+                telemetry_path=None if headless else f"{telemetry_base}_{name}{telemetry_ext}",
+                name=name,
+                threat_writer=self.threat_writer,
+                evidence_writer=self.evidence_writer,
+                detectors=self.detector_sets[0],
+                screen=self.screen,
+                display=False,  # Windows are shown from the main thread
+                render_overlay=self.display,
+            )
+            self.cameras.append(Camera(guardian, recorded))
+
+        self.condition = threading.Condition()
+        self.next_index = 0
+        self.running = False
+        self.threads = []
+        self.base_time = time.time()
+
+        print("🛡️  ZeroTrust Workspace Guardian Active")
+        print(f"📷 Monitoring {len(self.cameras)} cameras with {self.workers} detection workers")
+        print(f"⚙️  Preset: {config.ACTIVE_PRESET}")
+
+        # One metrics endpoint for all cameras, labelled by camera name
+        self.metrics_server = start_metrics_server(
+            lambda: guardian_metrics([camera.guardian for camera in self.cameras]))
+
+    def acquire_camera(self):
+        """Next idle camera in round-robin order (None once every camera has ended)"""
+        with self.condition:
+            while self.running:
+                count = len(self.cameras)
+                for offset in range(count):
+                    index = (self.next_index + offset) % count
+                    camera = self.cameras[index]
+                    if not camera.busy and not camera.finished:
+                        camera.busy = True
+                        self.next_index = index + 1
+                        return camera
+                if all(camera.finished for camera in self.cameras):
+                    return None
+                self.condition.wait(0.1)
+            return None
+
+    def release_camera(self, camera):
+        with self.condition:
+            camera.busy = False
+            self.condition.notify()
+
+    def worker(self, detectors):
+        while self.running:
+            camera = self.acquire_camera()
+            if camera is None:
+                break
+            try:
+                self.process(camera, detectors)
+            finally:
+                self.release_camera(camera)
+
+    def process(self, camera, detectors):
+        guardian = camera.guardian
+        if guardian.grabber is not None:
+            ret, frame = guardian.grabber.read(timeout=0.1)
+            if not ret:
+                camera.finished = guardian.grabber.ended
+                return
+        else:
+            ret, frame = guardian.read_frame()
+            if not ret:
+                camera.finished = True
+                return
+
+        current_time = None
+        if camera.recorded:
+            current_time = self.base_time + guardian.cap.last_frame_time
+        guardian.face_detector, guardian.phone_detector = detectors
+        guardian.process_frame(frame, current_time)
+        camera.frames += 1
+        # Copy the overlay here, while this worker owns the camera; the main thread only shows it
+        if self.display and guardian.overlays_rendered != camera.overlays_shown:
+            camera.overlays_shown = guardian.overlays_rendered
+            camera.latest_frame = guardian.overlay_frame.copy()
+
+    def run(self):
+        """Process every camera until they end or 'q' is pressed"""
+        self.running = True
+        for camera in self.cameras:
+            camera.started = time.perf_counter()
+        self.threads = [
+            threading.Thread(target=self.worker, args=(detectors,), name=f"CameraWorker-{i}", daemon=True)
+            for i, detectors in enumerate(self.detector_sets)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+        try:
+            while any(thread.is_alive() for thread in self.threads):
+                if not self.display:
+                    time.sleep(0.1)
+                    continue
+                for camera in self.cameras:
+                    if camera.latest_frame is not None:
+                        cv2.imshow(f"{config.DISPLAY['window_name']} [{camera.guardian.name}]", camera.latest_frame)
+                key = cv2.waitKey(15) & 0xFF
+                if key == ord('q'):
+                    break
+                if key == ord('t'):
+                    print(self.format_report())
+        except KeyboardInterrupt:
+            pass
+        self.cleanup()
+
+    def report(self):
+        """Per-camera throughput and end-to-end frame latency"""
+        report = {}
+        for camera in self.cameras:
+            guardian = camera.guardian
+            elapsed = time.perf_counter() - camera.started
+            latency = guardian.pipeline.histogram('total').summary()
+            dropped = guardian.grabber.stats()['dropped'] if guardian.grabber is not None else 0
+            report[guardian.name] = {
+                'frames': camera.frames,
+                'fps': camera.frames / elapsed if elapsed > 0 else 0.0,
+                'latency_p50_ms': latency['p50'],
+                'latency_p95_ms': latency['p95'],
+                'dropped': dropped,
+                'threats': guardian.threat_count,
+            }
+        return report
+
+    def format_report(self):
+        lines = [f"{'Camera':<10}{'frames':>8}{'fps':>8}{'p50 ms':>9}{'p95 ms':>9}{'dropped':>9}{'threats':>9}"]
+        for name, stats in self.report().items():
+            lines.append(f"{name:<10}{stats['frames']:>8}{stats['fps']:>8.1f}{stats['latency_p50_ms']:>9.1f}"
+                         f"{stats['latency_p95_ms']:>9.1f}{stats['dropped']:>9}{stats['threats']:>9}")
+        return "\n".join(lines)
+
+    def cleanup(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join()
+
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        report = self.format_report()
+        for camera in self.cameras:
+            camera.guardian.cleanup()
+        if self.display:
+            cv2.destroyAllWindows()
+        print(report)
+
+        if self.evidence_writer is not None:
+            self.evidence_writer.close()
+            stats = self.evidence_writer.stats()
+            print(f"🖼️  Evidence: {stats['files']} files ({stats['bytes'] / 1024 / 1024:.1f} MB) | {stats['evicted']} evicted")
+        self.threat_writer.close()
+        stats = self.threat_writer.stats()
+        print(f"💾 Threat log: {stats['written']} written in {stats['commits']} commits | "
+              f"max queue {stats['max_queue_depth']} | commit p95 {stats['commit_p95_ms']:.1f}ms")
+        print("🛡️  Guardian deactivated")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitor several cameras from one guardian process")
+    parser.add_argument('sources', nargs='*',
+                        help="Camera indexes, video files or image directories (default: PERFORMANCE['cameras'])")
+    parser.add_argument('--workers', type=int, help="Detection threads (default: one per core, at most one per camera)")
+    parser.add_argument('--headless', action='store_true', help="No windows and no real screen actions")
+    parser.add_argument('--database', help="Threat database (default: LOGGING['database_path'])")
+    args = parser.parse_args()
+
+    sources = args.sources or config.PERFORMANCE.get('cameras') or [config.PERFORMANCE['camera_index']]
+    sources = [int(source) if str(source).isdigit() else source for source in sources]
+    MultiCameraGuardian(sources, args.workers or config.PERFORMANCE.get('camera_workers'),
+                        args.headless, args.database).run()
+
+
+if __name__ == "__main__":
+    main()
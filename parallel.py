@@ -0,0 +1,183 @@
+"""
+Parallel detector execution for ZeroTrust Workspace Guardian
+Runs independent detectors on the same frame at the same time, one worker
+process each. The frame is copied once into shared memory, so workers read it
+without pickling, and only the small result lists travel back. Results are
+gathered per frame, in order, before the threat decision.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from frame_context import FrameContext
+from pipeline import LatencyHistogram
+
+# Per-process state of a worker: shared frame view, its context and the detectors
+_worker = {}
+
+
+def _init_worker(memory_name, shape, specs, threads):
+    # Spawned workers share the parent's resource tracker, so the parent's unlink is the only cleanup
+    memory = shared_memory.SharedMemory(name=memory_name)
+    cv2.setNumThreads(threads)
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=memory.buf)
+    _worker['memory'] = memory
+    _worker['context'] = FrameContext()
+    _worker['frame'] = frame
+    _worker['detectors'] = {name: factory(*args) for name, factory, args in specs}
+
+
+def _run_detector(name, args):
+    context = _worker['context'].reset(_worker['frame'])
+    return _worker['detectors'][name].detect(context, *args)
+
+
+def _ready():
+    return os.getpid()
+
+
+def _shutdown(executor, memory):
+    executor.shutdown(wait=True)
+    memory.close()
+    memory.unlink()
+
+
+class ParallelDetectors:
+    """
+    Worker pool for detectors built from (name, factory, args) specs.
+    factory(*args) runs in each worker and must return an object with
+    detect(frame_context, *args); factory and args must be picklable.
+    """
+
+    def __init__(self, specs, workers=None):
+        self.specs = list(specs)
+        self.workers = workers or len(self.specs)
+        self.executor = None
+        self.memory = None
+        self.frame = None
+
+        # Workers started by restart() in the background, swapped in by detect() once ready
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.replacement = None
+
+        # Metrics
+        self.frames = 0
+        self.gather_latency = LatencyHistogram()
+
+    def _spawn(self, shape, specs):
+        """Shared frame buffer and worker pool for frames of shape: (executor, memory, frame)"""
+        memory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=memory.buf)
+        # Split the cores between workers instead of letting each one use all of them
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        # spawn: safe alongside the capture thread, and the only choice on Windows
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(memory.name, shape, specs, threads),
+        )
+        return executor, memory, frame
+
+    def _start(self, shape):
+        self.close()
+        self.executor, self.memory, self.frame = self._spawn(shape, self.specs)
+
+    def _wait_ready(self, executor):
+        # Workers are spawned on demand; one task each brings them all up and through the initializer
+        for future in [executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+
+    def start(self, shape):
+        """Spawn the workers for frames of shape now, rather than on the first frame"""
+        shape = tuple(shape)
+        if self.frame is None or self.frame.shape != shape:
+            self._start(shape)
+        self._wait_ready(self.executor)
+
+    def restart(self, specs):
+        """Switch to new detector specs; the current workers keep detecting until the new ones are up"""
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            self.specs = list(specs)
+        if self.frame is None:
+            return  # Not started yet: the first frame starts workers with the new specs
+        threading.Thread(target=self._restart, args=(generation, self.frame.shape, self.specs),
+                         name="DetectorPoolRestart", daemon=True).start()
+
+    def _restart(self, generation, shape, specs):
+        pool = self._spawn(shape, specs)
+        try:
+            self._wait_ready(pool[0])
+        except Exception as e:
+            print(f"⚠️  Detector workers failed to restart, keeping the current ones: {e}")
+            _shutdown(*pool[:2])
+            return
+        with self.lock:
+            if generation == self.generation:
+                # A replacement that was never picked up is superseded by this one
+                self.replacement, pool = pool, self.replacement
+        if pool is not None:
+            _shutdown(*pool[:2])
+
+    def _swap(self):
+        with self.lock:
+            replacement, self.replacement = self.replacement, None
+        if replacement is None:
+            return
+        old = (self.executor, self.memory)
+        self.executor, self.memory, self.frame = replacement
+        if old[0] is not None:
+            # Idle now (detect() waits for its results); let it wind down off the frame thread
+            threading.Thread(target=_shutdown, args=old, name="DetectorPoolShutdown", daemon=True).start()
+
+    def detect(self, frame, requests):
+        """Run the requested detectors ({name: extra args}) on frame; returns {name: result}"""
+        if self.replacement is not None:
+            self._swap()
+        if self.frame is None or self.frame.shape != frame.shape:
+            self._start(frame.shape)
+
+        start = time.perf_counter_ns()
+        # Workers only read the frame while this call waits, so one shared buffer is enough
+        np.copyto(self.frame, frame)
+        futures = {name: self.executor.submit(_run_detector, name, tuple(args))
+                   for name, args in requests.items()}
+        results = {name: future.result() for name, future in futures.items()}
+        self.gather_latency.record(time.perf_counter_ns() - start)
+        self.frames += 1
+        return results
+
+    def stats(self):
+        latency = self.gather_latency.summary()
+        return {
+            'frames': self.frames,
+            'workers': self.workers,
+            'gather_p50_ms': latency['p50'],
+            'gather_p95_ms': latency['p95'],
+        }
+
+    def close(self):
+        with self.lock:
+            # Restarts still in progress shut their workers down when they finish
+            self.generation += 1
+            replacement, self.replacement = self.replacement, None
+        if replacement is not None:
+            _shutdown(*replacement[:2])
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        if self.memory is not None:
+            self.frame = None
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
@@ -0,0 +1,129 @@
+"""
+Phone/camera detection for ZeroTrust Workspace Guardian
+Finds phone-shaped rectangles in the edge map. Contour area and bounding-box
+aspect ratio are computed for all contours at once with NumPy, so the costly
+polygon approximation only runs on the few contours that pass both filters.
+"""
+
+import cv2
+import numpy as np
+
+from face_detection import merge_regions
+
+
+class PhoneDetector:
+    def __init__(self, min_area=3000, max_area=80000, portrait=(0.35, 0.75), landscape=(1.3, 2.2),
+                 min_corners=4, max_corners=8, person_roi=False, roi_margin=(2.0, 3.0)):
+        # Thresholds are unpacked once here instead of on every contour
+        self.min_area = float(min_area)
+        self.max_area = float(max_area)
+        self.portrait = tuple(portrait)
+        self.landscape = tuple(landscape)
+        self.min_corners = min_corners
+        self.max_corners = max_corners
+        self.person_roi = person_roi
+        self.roi_margin = tuple(roi_margin)
+        self.kernel = np.ones((3, 3), np.uint8)
+
+        # Counters
+        self.contours_seen = 0
+        self.contours_checked = 0
+
+    @classmethod
+    def from_config(cls, settings):
+        return cls(
+            min_area=settings['min_area'],
+            max_area=settings['max_area'],
+            portrait=settings['aspect_ratios']['portrait'],
+            landscape=settings['aspect_ratios']['landscape'],
+            person_roi=settings.get('person_roi', False),
+            roi_margin=settings.get('roi_margin', (2.0, 3.0)),
+        )
+
+    def detect(self, context, faces=None):
+        """Return phone-shaped boxes (x, y, w, h) found in a FrameContext"""
+        regions = self.regions(context.shape, faces) if self.person_roi else None
+        if not regions:
+            return self.find_boxes(context.closed_edges)
+
+        boxes = []
+        gray = context.gray
+        for x1, y1, x2, y2 in regions:
+            boxes.extend(self.detect_region(gray[y1:y2, x1:x2], x1, y1))
+        return boxes
+
+    def regions(self, shape, faces):
+        """Areas around and beside each detected person, where a phone would be held"""
+        if faces is None or len(faces) == 0:
+            return None
+        height, width = shape[:2]
+        side, below = self.roi_margin
+        regions = []
+        for x, y, w, h in faces:
+            regions.append([
+                max(0, int(x - side * w)),
+                max(0, int(y - h)),
+                min(width, int(x + w + side * w)),
+                min(height, int(y + h + below * h)),
+            ])
+        return merge_regions(regions)
+
+    def detect_region(self, gray, offset_x, offset_y):
+        # Preprocessing for better edge detection
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        edges = cv2.Canny(blurred, 30, 100)
+
+        # Morphological operations to connect edges
+        edges = cv2.dilate(edges, self.kernel, iterations=1)
+        edges = cv2.erode(edges, self.kernel, iterations=1)
+        return self.find_boxes(edges, offset_x, offset_y)
+
+    def find_boxes(self, edges, offset_x=0, offset_y=0):
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        self.contours_seen += len(contours)
+        if not contours:
+            return []
+
+        indices = self.candidates(contours)
+        self.contours_checked += len(indices)
+        boxes = []
+        for i in indices:
+            contour = contours[i]
+            # Verify it's rectangular (4-8 corners)
+            perimeter = cv2.arcLength(contour, True)
+            approx = cv2.approxPolyDP(contour, 0.04 * perimeter, True)
+            if self.min_corners <= len(approx) <= self.max_corners:
+                x, y, w, h = cv2.boundingRect(contour)
+                boxes.append((x + offset_x, y + offset_y, w, h))
+        return boxes
+
+    def candidates(self, contours):
+        """Indices of contours whose area and bounding-box aspect ratio fit a phone"""
+        lengths = np.fromiter((len(c) for c in contours), dtype=np.intp, count=len(contours))
+        starts = np.zeros(len(contours), dtype=np.intp)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        points = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+        x, y = points[:, 0], points[:, 1]
+
+        # Shoelace area per contour (closed polygon: the last point wraps to the first)
+        following = np.arange(1, len(points) + 1)
+        following[starts + lengths - 1] = starts
+        area = np.abs(np.add.reduceat(x * y[following] - x[following] * y, starts)) / 2.0
+
+        keep = (area > self.min_area) & (area < self.max_area)
+        if not keep.any():
+            return []
+
+        # Bounding boxes, same convention as cv2.boundingRect (inclusive pixel extent)
+        width = np.maximum.reduceat(x, starts) - np.minimum.reduceat(x, starts) + 1
+        height = np.maximum.reduceat(y, starts) - np.minimum.reduceat(y, starts) + 1
+        aspect = width / height
+        keep &= (((aspect > self.portrait[0]) & (aspect < self.portrait[1]))
+                 | ((aspect > self.landscape[0]) & (aspect < self.landscape[1])))
+        return np.flatnonzero(keep)
+
+    def stats(self):
+        return {
+            'contours': self.contours_seen,
+            'checked': self.contours_checked,
+        }
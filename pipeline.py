@@ -0,0 +1,136 @@
+"""
+Frame processing pipeline for ZeroTrust Workspace Guardian
+Runs named stages in order and records how long each one takes
+"""
+
+import json
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+
+def format_report(report):
+    """Render a stage latency report as an aligned text table"""
+    lines = [f"{'Stage':<14}{'count':>8}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)"]
+    for name, stats in report.items():
+        lines.append(f"{name:<14}{stats['count']:>8}{stats['mean']:>9.2f}{stats['p50']:>9.2f}"
+                     f"{stats['p95']:>9.2f}{stats['p99']:>9.2f}")
+    return "\n".join(lines)
+
+
+# Upper bounds of the cumulative latency buckets exported as metrics, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+_BUCKET_BOUNDS_NS = [bound * 1_000_000 for bound in LATENCY_BUCKETS_MS]
+
+
+class LatencyHistogram:
+    """Rolling window of latency samples with percentile lookup, plus lifetime bucket counts"""
+
+    def __init__(self, window=300):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total_ns = 0
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)  # Last one: above every bound
+
+    def record(self, elapsed_ns):
+        self.samples.append(elapsed_ns)
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.bucket_counts[bisect_left(_BUCKET_BOUNDS_NS, elapsed_ns)] += 1
+
+    def buckets(self):
+        """Cumulative (upper bound in ms, count) pairs since start; the last bound is infinity"""
+        cumulative = []
+        total = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + (float('inf'),), list(self.bucket_counts)):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+    def percentile(self, pct, ordered=None):
+        """Latency in milliseconds at the given percentile of the window"""
+        ordered = ordered or sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[int(round(pct / 100.0 * (len(ordered) - 1)))] / 1e6
+
+    def summary(self):
+        if not self.samples:
+            return {'count': self.count, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'mean': sum(ordered) / len(ordered) / 1e6,
+            'p50': self.percentile(50, ordered),
+            'p95': self.percentile(95, ordered),
+            'p99': self.percentile(99, ordered),
+        }
+
+
+class Pipeline:
+    """Ordered list of named stages sharing a per-frame state dict"""
+
+    def __init__(self, window=300):
+        self.window = window
+        self.stages = []
+        self.histograms = {}
+        self.finished = deque(maxlen=window)  # When recent frames completed (for fps)
+
+    def add_stage(self, name, func, before=None):
+        """Register a stage; it receives the frame state and may return False to stop the frame"""
+        self.histogram(name)
+        if before is None:
+            self.stages.append((name, func))
+            return
+        index = [stage_name for stage_name, _ in self.stages].index(before)
+        self.stages.insert(index, (name, func))
+
+    def histogram(self, name):
+        if name not in self.histograms:
+            self.histograms[name] = LatencyHistogram(self.window)
+        return self.histograms[name]
+
+    @contextmanager
+    def timed(self, name):
+        """Time a block of work outside the stage list (e.g. capture)"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.histogram(name).record(time.perf_counter_ns() - start)
+
+    def run(self, state):
+        """Run every stage on one frame"""
+        start = time.perf_counter_ns()
+        for name, func in self.stages:
+            stage_start = time.perf_counter_ns()
+            result = func(state)
+            self.histograms[name].record(time.perf_counter_ns() - stage_start)
+            if result is False:
+                break
+        end = time.perf_counter_ns()
+        state['latency_ns'] = end - start
+        self.histogram('total').record(state['latency_ns'])
+        self.finished.append(end)
+        return state
+
+    def fps(self):
+        """Frames per second over the recent window (0 until two frames have run)"""
+        finished = self.finished
+        if len(finished) < 2:
+            return 0.0
+        first, last = finished[0], finished[-1]
+        return (len(finished) - 1) / ((last - first) / 1e9) if last > first else 0.0
+
+    def report(self):
+        """Latency summary per stage, in milliseconds"""
+        return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def format_report(self):
+        return format_report(self.report())
+
+    def dump(self, path):
+        """Write the latency summary as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
@@ -0,0 +1,143 @@
+"""
+Report export for ZeroTrust Workspace Guardian
+Streams threats from SQLite in fixed-size chunks, so memory use does not grow
+with history. Writes the plain-text report, CSV, or JSON Lines (for SIEM import).
+
+Usage:
+    python reports.py --format csv --since 2026-01-01 --until 2026-02-01
+    python reports.py --format jsonl --type "User Absence" --output absence.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+from datetime import datetime
+
+from storage import SELECT_COLUMNS, SELECT_THREATS, connect, init_schema, to_epoch_ms
+
+FORMATS = {'txt': '.txt', 'csv': '.csv', 'jsonl': '.jsonl'}
+COLUMNS = SELECT_COLUMNS
+
+TEXT_ENTRY = (
+    "Threat ID: {}\n"
+    "Timestamp: {}\n"
+    "Type: {}\n"
+    "Face Count: {}\n"
+    "Action Taken: {}\n"
+    "Evidence: {}\n"
+    "Clip: {}\n"
+    + "-" * 80 + "\n\n"
+)
+
+
+def build_filter(since=None, until=None, threat_type=None):
+    """WHERE clause and parameters for the time-range / type filters (all index-backed)"""
+    clauses = []
+    params = []
+    if since:
+        clauses.append('t.ts_ms >= ?')
+        params.append(to_epoch_ms(since))
+    if until:
+        clauses.append('t.ts_ms < ?')
+        params.append(to_epoch_ms(until))
+    if threat_type:
+        clauses.append('t.threat_code = (SELECT code FROM threat_types WHERE name = ?)')
+        params.append(threat_type)
+    where = (' WHERE ' + ' AND '.join(clauses)) if clauses else ''
+    return where, params
+
+
+def iter_threat_chunks(conn, since=None, until=None, threat_type=None, chunk_size=1000):
+    """Yield lists of at most chunk_size threat rows, newest first"""
+    where, params = build_filter(since, until, threat_type)
+    cursor = conn.execute(
+        f"{SELECT_THREATS}{where} ORDER BY t.ts_ms DESC, t.id DESC", params
+    )
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+
+def count_threats(conn, since=None, until=None, threat_type=None):
+    where, params = build_filter(since, until, threat_type)
+    return conn.execute(f"SELECT COUNT(*) FROM threats t{where}", params).fetchone()[0]
+
+
+def export_threats(conn, path, fmt='txt', since=None, until=None, threat_type=None, chunk_size=1000):
+    """Write matching threats to path in the given format; returns the number written"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown report format: {fmt}")
+    # Reject malformed filters before the output file is created
+    build_filter(since, until, threat_type)
+    chunks = iter_threat_chunks(conn, since, until, threat_type, chunk_size)
+    written = 0
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            for rows in chunks:
+                writer.writerows(rows)
+                written += len(rows)
+
+        elif fmt == 'jsonl':
+            for rows in chunks:
+                f.write(''.join(json.dumps(dict(zip(COLUMNS, row))) + "\n" for row in rows))
+                written += len(rows)
+
+        else:
+            f.write("=" * 80 + "\n")
+            f.write("ZEROTRUST WORKSPACE GUARDIAN - SECURITY REPORT\n")
+            f.write("=" * 80 + "\n\n")
+            f.write(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            if since or until or threat_type:
+                f.write(f"Filter: {since or 'start'} to {until or 'now'}"
+                        f"{' | Type: ' + threat_type if threat_type else ''}\n")
+            f.write(f"Total Threats Detected: {count_threats(conn, since, until, threat_type)}\n\n")
+            f.write("-" * 80 + "\n\n")
+
+            for rows in chunks:
+                f.write(''.join(TEXT_ENTRY.format(*threat[:4], threat[6], threat[7] or 'N/A', threat[8] or 'N/A') for threat in rows))
+                written += len(rows)
+
+    return written
+
+
+def default_filename(fmt):
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f'security_report_{timestamp}{FORMATS[fmt]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the threat log")
+    parser.add_argument('--database', default='security_log.db')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='txt')
+    parser.add_argument('--since', help="Start time, inclusive (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument('--until', help="End time, exclusive (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument('--type', dest='threat_type', help="Only this threat type, e.g. 'User Absence'")
+    parser.add_argument('--output', help="Output file (default: security_report_<time>.<ext>)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.database):
+        print(f"❌ No database at {args.database}")
+        return
+
+    output = args.output or default_filename(args.format)
+    # Databases written by an older guardian are migrated in place on first open
+    conn = connect(args.database)
+    try:
+        init_schema(conn)
+        count = export_threats(conn, output, args.format, args.since, args.until, args.threat_type)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    finally:
+        conn.close()
+    print(f"✅ Report exported: {output} ({count} threats)")
+
+
+if __name__ == "__main__":
+    main()
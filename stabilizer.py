@@ -0,0 +1,95 @@
+"""
+Streaming stabilization for ZeroTrust Workspace Guardian
+Windowed statistics over small integer observations (face counts, 0/1 detections)
+with constant-time updates, using a count histogram instead of sorting the window.
+"""
+
+import time
+from collections import deque
+
+
+class StreamingStabilizer:
+    """Sliding window over the last N samples, or the last N seconds if window_seconds is set"""
+
+    def __init__(self, window_size=30, window_seconds=None, max_value=32):
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.max_value = max_value
+        self.samples = deque()
+        self.counts = [0] * (max_value + 1)
+        self.total = 0
+
+    def __len__(self):
+        return len(self.samples)
+
+    def update(self, value, timestamp=None):
+        """Add an observation and evict whatever fell out of the window"""
+        if timestamp is None:
+            timestamp = time.time()
+        value = min(max(int(value), 0), self.max_value)
+        self.samples.append((timestamp, value))
+        self.counts[value] += 1
+        self.total += value
+        self._evict(timestamp)
+
+    def _evict(self, now):
+        samples = self.samples
+        if self.window_seconds is not None:
+            cutoff = now - self.window_seconds
+            # Always keep the newest sample so statistics stay defined
+            while len(samples) > 1 and samples[0][0] < cutoff:
+                self._drop()
+        else:
+            while len(samples) > self.window_size:
+                self._drop()
+
+    def _drop(self):
+        _, value = self.samples.popleft()
+        self.counts[value] -= 1
+        self.total -= value
+
+    def median(self):
+        """Upper median of the window (same as sorted(window)[len // 2])"""
+        if not self.samples:
+            return 0
+        target = len(self.samples) // 2
+        seen = 0
+        for value, count in enumerate(self.counts):
+            seen += count
+            if seen > target:
+                return value
+        return self.max_value
+
+    def mode(self):
+        """Most frequent value in the window (smallest on ties)"""
+        if not self.samples:
+            return 0
+        return max(range(len(self.counts)), key=lambda value: (self.counts[value], -value))
+
+    def consistency(self, value=None):
+        """Fraction of the window equal to value (the median by default)"""
+        if not self.samples:
+            return 0.0
+        if value is None:
+            value = self.median()
+        if not 0 <= value <= self.max_value:
+            return 0.0
+        return self.counts[value] / len(self.samples)
+
+    def ratio(self):
+        """Mean of the window, e.g. the fraction of 1s for 0/1 detections"""
+        if not self.samples:
+            return 0.0
+        return self.total / len(self.samples)
+
+    def resize(self, window_size=None, window_seconds=None):
+        """Change the window, keeping as much history as still fits"""
+        self.window_size = window_size if window_size is not None else self.window_size
+        self.window_seconds = window_seconds
+        if self.samples:
+            self._evict(self.samples[-1][0])
+
+    def clear(self):
+        self.samples.clear()
+        self.counts = [0] * (self.max_value + 1)
+        self.total = 0
@@ -0,0 +1,306 @@
+"""
+Threat storage for ZeroTrust Workspace Guardian
+Threat rows are queued by the detection loop and committed in batches by a
+background writer thread, with WAL journaling so the dashboard can read
+while the guardian writes.
+
+Schema v3 stores epoch-millisecond timestamps and integer threat-type codes,
+indexed for time-range and per-type queries, plus the path of each threat's
+evidence clip. Older databases (v1: TEXT timestamps and type names; v2: no
+clip column) are migrated in place on first open.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from pipeline import LatencyHistogram
+
+SCHEMA_VERSION = 3
+
+# Built-in threat types; unknown names get a new code on first insert
+THREAT_TYPES = {
+    1: 'Shoulder Surfing',
+    2: 'Camera/Phone Recording',
+    3: 'User Absence',
+}
+
+INSERT_THREAT_TYPE = 'INSERT OR IGNORE INTO threat_types (name) VALUES (?)'
+
+INSERT_THREAT = '''
+    INSERT INTO threats (ts_ms, threat_code, face_count, stable_face_count, confidence, action_taken,
+                         screenshot_path, clip_path)
+    VALUES (?, (SELECT code FROM threat_types WHERE name = ?), ?, ?, ?, ?, ?, ?)
+'''
+
+# Threat rows as people read them: local time and type name instead of epoch and code
+SELECT_THREATS = '''
+    SELECT t.id, strftime('%Y-%m-%d %H:%M:%S', t.ts_ms / 1000, 'unixepoch', 'localtime'),
+           tt.name, t.face_count, t.stable_face_count, t.confidence,
+           t.action_taken, t.screenshot_path, t.clip_path, t.ts_ms
+    FROM threats t JOIN threat_types tt ON tt.code = t.threat_code
+'''
+SELECT_COLUMNS = ('id', 'timestamp', 'threat_type', 'face_count', 'stable_face_count', 'confidence',
+                  'action_taken', 'screenshot_path', 'clip_path', 'ts_ms')
+
+# Per-type counts straight from the (threat_code, ts_ms) index
+COUNT_BY_TYPE = '''
+    SELECT tt.name, c.n
+    FROM (SELECT threat_code, COUNT(*) AS n FROM threats {where} GROUP BY threat_code) c
+    JOIN threat_types tt ON tt.code = c.threat_code
+'''
+
+
+def connect(database_path, timeout=5.0, synchronous='FULL'):
+    """Open a database in WAL mode"""
+    conn = sqlite3.connect(database_path, timeout=timeout)
+    conn.execute('PRAGMA journal_mode=WAL')
+    # FULL syncs every commit, so a power cut cannot take the last threat rows with it.
+    # The batched commits run on the writer thread, never on the frame loop.
+    conn.execute(f'PRAGMA synchronous={synchronous}')
+    return conn
+
+
+def to_epoch_ms(value):
+    """Epoch milliseconds from a datetime, 'YYYY-MM-DD[ HH:MM[:SS]]' local time, or a number"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return int(datetime.strptime(value.strip(), fmt).timestamp() * 1000)
+        except ValueError:
+            pass
+    raise ValueError(f"Unrecognised time: {value!r} (use YYYY-MM-DD[ HH:MM:SS])")
+
+
+def create_tables(conn, table='threats'):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS threat_types (
+            code INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL
+        )
+    ''')
+    conn.executemany('INSERT OR IGNORE INTO threat_types (code, name) VALUES (?, ?)', THREAT_TYPES.items())
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts_ms INTEGER NOT NULL,
+            threat_code INTEGER NOT NULL REFERENCES threat_types(code),
+            face_count INTEGER,
+            stable_face_count INTEGER,
+            confidence REAL,
+            action_taken TEXT,
+            screenshot_path TEXT,
+            clip_path TEXT
+        )
+    ''')
+
+
+def create_indexes(conn):
+    # Time-range queries and per-type counts/filters are served from these indexes
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_threats_ts ON threats(ts_ms)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_threats_code_ts ON threats(threat_code, ts_ms)')
+
+
+def init_schema(conn):
+    """Create the schema, or migrate an older database in place"""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version == SCHEMA_VERSION:
+        return
+    if version > SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(
+            f"Database schema v{version} is newer than this guardian (v{SCHEMA_VERSION})"
+        )
+
+    with conn:
+        # Take the write lock first; another process may have migrated meanwhile
+        conn.execute('BEGIN IMMEDIATE')
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+
+        # Before versioning (v1) the threats table had TEXT timestamps and no user_version
+        legacy = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'threats'"
+        ).fetchone()
+        if version == 2:
+            add_clip_column(conn)
+        elif legacy:
+            migrate_text_timestamps(conn)
+        else:
+            create_tables(conn)
+        create_indexes(conn)
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+
+def migrate_text_timestamps(conn):
+    """v1 -> v3: TEXT local-time timestamps and type names become epoch ms and type codes"""
+    count = conn.execute('SELECT COUNT(*) FROM threats').fetchone()[0]
+    print(f"🔧 Migrating threat log to schema v{SCHEMA_VERSION} ({count} rows)...")
+
+    create_tables(conn, 'threats_v2')
+    conn.execute("INSERT OR IGNORE INTO threat_types (name) "
+                 "SELECT DISTINCT COALESCE(threat_type, 'Unknown') FROM threats")
+    # strftime('%s', ..., 'utc') reads the stored text as local time
+    conn.execute('''
+        INSERT INTO threats_v2 (id, ts_ms, threat_code, face_count, action_taken, screenshot_path)
+        SELECT t.id,
+               COALESCE(CAST(strftime('%s', t.timestamp, 'utc') AS INTEGER), 0) * 1000,
+               tt.code,
+               t.face_count, t.action_taken, t.screenshot_path
+        FROM threats t JOIN threat_types tt ON tt.name = COALESCE(t.threat_type, 'Unknown')
+    ''')
+
+    # Keep AUTOINCREMENT from reusing ids of rows deleted before the migration
+    old_seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'threats'").fetchone()
+    conn.execute('DROP TABLE threats')
+    conn.execute('ALTER TABLE threats_v2 RENAME TO threats')
+    if old_seq:
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'threats'", old_seq)
+
+
+def add_clip_column(conn):
+    """v2 -> v3: threats gain clip_path (existing rows have no clip)"""
+    print(f"🔧 Migrating threat log to schema v{SCHEMA_VERSION}...")
+    conn.execute('ALTER TABLE threats ADD COLUMN clip_path TEXT')
+
+
+class ThreatWriter:
+    def __init__(self, database_path, batch_size=50, flush_interval=0.5, max_retries=3):
+        self.database_path = database_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+
+        # Unbounded queue: put() never blocks the detection thread
+        self.queue = queue.Queue()
+        self.ready = threading.Event()
+        self.error = None
+
+        # Metrics
+        self.rows_queued = 0
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.commits = 0
+        self.max_queue_depth = 0
+        self.commit_latency = LatencyHistogram()
+
+        self.thread = threading.Thread(target=self._run, name="ThreatWriter", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    def log(self, row):
+        """Queue one threat row; returns immediately"""
+        self.queue.put(('row', row))
+        self.rows_queued += 1
+        depth = self.queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far is committed"""
+        done = threading.Event()
+        self.queue.put(('flush', done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Commit what is left and stop the writer thread"""
+        self.queue.put(('stop', None))
+        self.thread.join(timeout)
+
+    def pending(self):
+        return self.queue.qsize()
+
+    def stats(self):
+        latency = self.commit_latency.summary()
+        return {
+            'queued': self.rows_queued,
+            'written': self.rows_written,
+            'dropped': self.rows_dropped,
+            'pending': self.pending(),
+            'max_queue_depth': self.max_queue_depth,
+            'commits': self.commits,
+            'commit_p50_ms': latency['p50'],
+            'commit_p95_ms': latency['p95'],
+        }
+
+    def _run(self):
+        # SQLite connections belong to the thread that opened them
+        try:
+            conn = connect(self.database_path)
+            init_schema(conn)
+        except sqlite3.Error as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+
+        stopping = False
+        while not stopping:
+            batch = []
+            waiters = []
+            try:
+                kind, item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            # Drain whatever else is already waiting, up to one batch
+            while True:
+                if kind == 'row':
+                    batch.append(item)
+                elif kind == 'flush':
+                    waiters.append(item)
+                else:
+                    stopping = True
+                if len(batch) >= self.batch_size or stopping:
+                    break
+                try:
+                    kind, item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._commit(conn, batch)
+            for waiter in waiters:
+                waiter.set()
+
+        # Anything queued after the stop request still gets written
+        leftover = []
+        while True:
+            try:
+                kind, item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'row':
+                leftover.append(item)
+            elif kind == 'flush':
+                item.set()
+        if leftover:
+            self._commit(conn, leftover)
+        conn.close()
+
+    def _commit(self, conn, batch):
+        for attempt in range(self.max_retries):
+            start = time.perf_counter_ns()
+            try:
+                with conn:
+                    conn.executemany(INSERT_THREAT_TYPE, {(row[1],) for row in batch})
+                    conn.executemany(INSERT_THREAT, batch)
+            except sqlite3.Error as e:
+                print(f"⚠️  Threat log write failed ({e}), retrying...")
+                time.sleep(0.1 * (attempt + 1))
+                continue
+            self.commit_latency.record(time.perf_counter_ns() - start)
+            self.commits += 1
+            self.rows_written += len(batch)
+            return
+        self.rows_dropped += len(batch)
+        print(f"❌ Dropped {len(batch)} threat log rows after {self.max_retries} attempts")
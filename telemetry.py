@@ -0,0 +1,303 @@
+"""
+Telemetry store for ZeroTrust Workspace Guardian
+Records per-frame detection signals and frame latency at a fixed sample rate,
+in its own database so it never competes with the threat log. A background
+thread folds every sample into 1-second, 1-minute and 1-hour rollups and prunes
+each tier to its own retention, so storage stays bounded however long it runs.
+
+Usage:
+    python telemetry.py --resolution 1m --since "2026-01-01 09:00"
+"""
+
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from storage import connect, to_epoch_ms
+
+TELEMETRY_SCHEMA_VERSION = 1
+
+# Rollup tiers: name -> bucket width in milliseconds
+RESOLUTIONS = {'1s': 1000, '1m': 60000, '1h': 3600000}
+
+SAMPLE_COLUMNS = ('ts_ms', 'face_count', 'stable_face_count', 'face_consistency',
+                  'phone_detected', 'phone_stable', 'privacy_mode', 'latency_ms')
+
+INSERT_SAMPLE = f'''
+    INSERT OR REPLACE INTO telemetry_samples ({', '.join(SAMPLE_COLUMNS)})
+    VALUES ({', '.join('?' * len(SAMPLE_COLUMNS))})
+'''
+
+# Rollups merge into existing buckets, so a bucket may be built across several batches
+UPSERT_ROLLUP = '''
+    INSERT INTO telemetry_rollups (resolution_ms, bucket_ms, samples, face_count_sum, face_count_max,
+                                   stable_face_sum, consistency_sum, phone_hits, phone_stable_hits,
+                                   privacy_samples, latency_sum_ms, latency_max_ms)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (resolution_ms, bucket_ms) DO UPDATE SET
+        samples = samples + excluded.samples,
+        face_count_sum = face_count_sum + excluded.face_count_sum,
+        face_count_max = MAX(face_count_max, excluded.face_count_max),
+        stable_face_sum = stable_face_sum + excluded.stable_face_sum,
+        consistency_sum = consistency_sum + excluded.consistency_sum,
+        phone_hits = phone_hits + excluded.phone_hits,
+        phone_stable_hits = phone_stable_hits + excluded.phone_stable_hits,
+        privacy_samples = privacy_samples + excluded.privacy_samples,
+        latency_sum_ms = latency_sum_ms + excluded.latency_sum_ms,
+        latency_max_ms = MAX(latency_max_ms, excluded.latency_max_ms)
+'''
+
+# Averages and rates per bucket, as people read them
+SELECT_ROLLUPS = '''
+    SELECT strftime('%Y-%m-%d %H:%M:%S', bucket_ms / 1000, 'unixepoch', 'localtime'),
+           samples,
+           face_count_sum * 1.0 / samples, face_count_max,
+           stable_face_sum * 1.0 / samples, consistency_sum / samples,
+           phone_hits * 1.0 / samples, phone_stable_hits * 1.0 / samples,
+           privacy_samples * 1.0 / samples,
+           latency_sum_ms / samples, latency_max_ms
+    FROM telemetry_rollups
+    WHERE resolution_ms = ? AND bucket_ms >= ? AND bucket_ms < ?
+    ORDER BY bucket_ms
+'''
+
+
+def init_telemetry_schema(conn):
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version == TELEMETRY_SCHEMA_VERSION:
+        return
+    if version > TELEMETRY_SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(
+            f"Telemetry schema v{version} is newer than this guardian (v{TELEMETRY_SCHEMA_VERSION})"
+        )
+
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS telemetry_samples (
+                ts_ms INTEGER PRIMARY KEY,
+                face_count INTEGER,
+                stable_face_count INTEGER,
+                face_consistency REAL,
+                phone_detected INTEGER,
+                phone_stable INTEGER,
+                privacy_mode INTEGER,
+                latency_ms REAL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS telemetry_rollups (
+                resolution_ms INTEGER NOT NULL,
+                bucket_ms INTEGER NOT NULL,
+                samples INTEGER NOT NULL,
+                face_count_sum INTEGER,
+                face_count_max INTEGER,
+                stable_face_sum INTEGER,
+                consistency_sum REAL,
+                phone_hits INTEGER,
+                phone_stable_hits INTEGER,
+                privacy_samples INTEGER,
+                latency_sum_ms REAL,
+                latency_max_ms REAL,
+                PRIMARY KEY (resolution_ms, bucket_ms)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute(f'PRAGMA user_version = {TELEMETRY_SCHEMA_VERSION}')
+
+
+def rollup(samples):
+    """Aggregate sample rows into upsert rows for every resolution"""
+    buckets = {}
+    for ts_ms, faces, stable, consistency, phone, phone_stable, privacy, latency in samples:
+        for width in RESOLUTIONS.values():
+            key = (width, ts_ms - ts_ms % width)
+            b = buckets.get(key)
+            if b is None:
+                buckets[key] = [1, faces, faces, stable, consistency, phone, phone_stable, privacy, latency, latency]
+                continue
+            b[0] += 1
+            b[1] += faces
+            b[2] = max(b[2], faces)
+            b[3] += stable
+            b[4] += consistency
+            b[5] += phone
+            b[6] += phone_stable
+            b[7] += privacy
+            b[8] += latency
+            b[9] = max(b[9], latency)
+    return [key + tuple(values) for key, values in buckets.items()]
+
+
+class TelemetryStore:
+    def __init__(self, database_path, sample_rate=5.0, flush_interval=1.0, prune_interval=60.0, retention=None):
+        """retention maps 'samples' and each RESOLUTIONS name to seconds kept (None = forever)"""
+        self.database_path = database_path
+        self.sample_interval_ms = 1000.0 / sample_rate if sample_rate else 0.0
+        self.flush_interval = flush_interval
+        self.prune_interval = prune_interval
+        self.retention = retention or {}
+
+        self.queue = queue.Queue()
+        self.ready = threading.Event()
+        self.error = None
+        self.last_sample_ms = None
+
+        # Counters
+        self.frames_seen = 0
+        self.samples_queued = 0
+        self.samples_written = 0
+        self.rows_pruned = 0
+
+        self.thread = threading.Thread(target=self._run, name="TelemetryStore", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    def record(self, timestamp, face_count, stable_face_count, face_consistency,
+               phone_detected, phone_stable, privacy_mode, latency_ms):
+        """Offer one frame's signals; kept only if a sample is due"""
+        self.frames_seen += 1
+        ts_ms = int(timestamp * 1000)
+        if self.last_sample_ms is not None and ts_ms - self.last_sample_ms < self.sample_interval_ms:
+            return False
+        self.last_sample_ms = ts_ms
+        self.queue.put(('sample', (ts_ms, int(face_count), int(stable_face_count), float(face_consistency),
+                                   int(bool(phone_detected)), int(bool(phone_stable)), int(bool(privacy_mode)),
+                                   float(latency_ms))))
+        self.samples_queued += 1
+        return True
+
+    def flush(self, timeout=5.0):
+        done = threading.Event()
+        self.queue.put(('flush', done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        self.queue.put(('stop', None))
+        self.thread.join(timeout)
+
+    def stats(self):
+        return {
+            'frames': self.frames_seen,
+            'queued': self.samples_queued,
+            'written': self.samples_written,
+            'pending': self.queue.qsize(),
+            'pruned': self.rows_pruned,
+        }
+
+    def _run(self):
+        try:
+            # Losing the last samples in a power cut is acceptable for telemetry
+            conn = connect(self.database_path, synchronous='NORMAL')
+            init_telemetry_schema(conn)
+        except sqlite3.Error as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+
+        next_prune = 0.0
+        stopping = False
+        while not stopping:
+            batch = []
+            waiters = []
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+                while True:
+                    kind, value = item
+                    if kind == 'sample':
+                        batch.append(value)
+                    elif kind == 'flush':
+                        waiters.append(value)
+                    else:
+                        stopping = True
+                    item = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+
+            if batch:
+                self._commit(conn, batch)
+            if batch and time.monotonic() >= next_prune:
+                self.prune(conn, batch[-1][0])
+                next_prune = time.monotonic() + self.prune_interval
+            for waiter in waiters:
+                waiter.set()
+        conn.close()
+
+    def _commit(self, conn, batch):
+        try:
+            with conn:
+                conn.executemany(INSERT_SAMPLE, batch)
+                conn.executemany(UPSERT_ROLLUP, rollup(batch))
+        except sqlite3.Error as e:
+            print(f"⚠️  Telemetry write failed ({e}), {len(batch)} samples lost")
+            return
+        self.samples_written += len(batch)
+
+    def prune(self, conn, now_ms):
+        """Drop rows older than each tier's retention (relative to the newest sample)"""
+        try:
+            with conn:
+                keep = self.retention.get('samples')
+                if keep is not None:
+                    cursor = conn.execute('DELETE FROM telemetry_samples WHERE ts_ms < ?', (now_ms - keep * 1000,))
+                    self.rows_pruned += cursor.rowcount
+                for name, width in RESOLUTIONS.items():
+                    keep = self.retention.get(name)
+                    if keep is not None:
+                        cursor = conn.execute(
+                            'DELETE FROM telemetry_rollups WHERE resolution_ms = ? AND bucket_ms < ?',
+                            (width, now_ms - keep * 1000),
+                        )
+                        self.rows_pruned += cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"⚠️  Telemetry prune failed: {e}")
+
+
+def query_rollups(conn, resolution='1m', since=None, until=None):
+    """Rollup rows at one resolution within [since, until)"""
+    return conn.execute(SELECT_ROLLUPS, (
+        RESOLUTIONS[resolution],
+        to_epoch_ms(since) if since else 0,
+        to_epoch_ms(until) if until else 2 ** 62,
+    )).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show telemetry rollups")
+    parser.add_argument('--database', default='telemetry.db')
+    parser.add_argument('--resolution', choices=list(RESOLUTIONS), default='1m')
+    parser.add_argument('--since', help="Start time, inclusive (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument('--until', help="End time, exclusive (YYYY-MM-DD[ HH:MM:SS])")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.database):
+        print(f"❌ No telemetry database at {args.database}")
+        return
+
+    conn = sqlite3.connect(args.database)
+    try:
+        rows = query_rollups(conn, args.resolution, args.since, args.until)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    except sqlite3.Error as e:
+        print(f"❌ Could not read telemetry from {args.database}: {e}")
+        return
+    finally:
+        conn.close()
+
+    print(f"{'Bucket':<21}{'n':>6}{'faces':>7}{'max':>5}{'stable':>8}{'cons':>6}"
+          f"{'phone':>7}{'priv':>6}{'lat ms':>8}{'max':>8}")
+    for bucket, n, faces, faces_max, stable, cons, phone, _, privacy, latency, latency_max in rows:
+        print(f"{bucket:<21}{n:>6}{faces:>7.2f}{faces_max:>5}{stable:>8.2f}{cons:>6.2f}"
+              f"{phone:>7.0%}{privacy:>6.0%}{latency:>8.1f}{latency_max:>8.1f}")
+    print(f"{len(rows)} buckets")
+
+
+if __name__ == "__main__":
+    main()
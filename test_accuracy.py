@@ -4,8 +4,13 @@ Test script to verify detection accuracy
 import cv2
 import time
 
-# Load face detector
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+from face_detection import non_max_suppression
+from frame_context import FrameContext
+from guardian import face_detector_factory
+
+# Load the face detector exactly as the guardian builds it from config.FACE_DETECTION
+face_detector = face_detector_factory()()
+context = FrameContext()
 
 # Open webcam
 cap = cv2.VideoCapture(0)
@@ -27,16 +32,8 @@ while True:
     if not ret:
         break
     
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    
     # Test with same parameters as guardian
-    faces = face_cascade.detectMultiScale(
-        gray,
-        scaleFactor=1.15,
-        minNeighbors=5,
-        minSize=(60, 60),
-        maxSize=(400, 400)
-    )
+    faces = non_max_suppression(face_detector.detect(context.reset(frame)))
     
     face_count = len(faces)
     face_counts.append(face_count)
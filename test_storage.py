@@ -0,0 +1,136 @@
+"""
+Threat log schema migration tests: databases written by older guardians
+must keep every threat when they are upgraded in place
+"""
+import sqlite3
+
+from storage import (INSERT_THREAT, INSERT_THREAT_TYPE, SCHEMA_VERSION, SELECT_THREATS, connect, init_schema,
+                     to_epoch_ms)
+
+# Threat log as the original guardian created it (v1: no user_version)
+V1_SCHEMA = '''
+    CREATE TABLE threats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT,
+        threat_type TEXT,
+        face_count INTEGER,
+        action_taken TEXT,
+        screenshot_path TEXT,
+        location TEXT
+    )
+'''
+
+# v2: epoch-ms timestamps and type codes, no clip column
+V2_SCHEMA = '''
+    CREATE TABLE threat_types (
+        code INTEGER PRIMARY KEY,
+        name TEXT UNIQUE NOT NULL
+    );
+    INSERT INTO threat_types (code, name) VALUES (1, 'Shoulder Surfing'), (2, 'Camera/Phone Recording'),
+                                                 (3, 'User Absence');
+    CREATE TABLE threats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts_ms INTEGER NOT NULL,
+        threat_code INTEGER NOT NULL REFERENCES threat_types(code),
+        face_count INTEGER,
+        stable_face_count INTEGER,
+        confidence REAL,
+        action_taken TEXT,
+        screenshot_path TEXT
+    );
+    CREATE INDEX idx_threats_ts ON threats(ts_ms);
+    CREATE INDEX idx_threats_code_ts ON threats(threat_code, ts_ms);
+    PRAGMA user_version = 2;
+'''
+
+V1_ROWS = [
+    ('2026-01-05 10:00:00', 'Shoulder Surfing', 2, 'Screen Minimized', 'threat_logs/a.jpg'),
+    ('2026-01-05 10:05:30', 'Camera/Phone Recording', 1, 'Screen Minimized', None),
+    ('2026-01-06 08:15:00', 'Custom Threat', 0, 'Screen Locked (Simulated)', None),
+]
+
+
+def threats(conn):
+    return {row[0]: row for row in conn.execute(SELECT_THREATS + ' ORDER BY t.id')}
+
+
+def test_v1_migrates_to_current(tmp_path):
+    path = str(tmp_path / 'v1.db')
+    conn = sqlite3.connect(path)
+    conn.execute(V1_SCHEMA)
+    conn.executemany('INSERT INTO threats (timestamp, threat_type, face_count, action_taken, screenshot_path) '
+                     'VALUES (?, ?, ?, ?, ?)', V1_ROWS)
+    conn.execute('DELETE FROM threats WHERE id = 2')  # Ids must survive, gaps included
+    conn.commit()
+    conn.close()
+
+    conn = connect(path)
+    init_schema(conn)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+
+    rows = threats(conn)
+    assert sorted(rows) == [1, 3]
+    for threat_id in rows:
+        timestamp, threat_type, face_count, action, screenshot = V1_ROWS[threat_id - 1]
+        row = rows[threat_id]
+        assert row[1] == timestamp  # Shown back in local time
+        assert row[-1] == to_epoch_ms(timestamp)
+        assert row[2] == threat_type
+        assert row[3] == face_count
+        assert row[6] == action
+        assert row[7] == screenshot
+        assert row[8] is None  # clip_path
+
+    # New rows continue after the highest id ever used, not the highest left
+    with conn:
+        conn.execute(INSERT_THREAT_TYPE, ('User Absence',))
+        conn.execute(INSERT_THREAT, (0, 'User Absence', 0, 0, 1.0, 'Screen Locked (Simulated)', None, 'c.avi'))
+    assert max(threats(conn)) == 4
+    conn.close()
+
+
+def test_v2_gains_clip_path(tmp_path):
+    path = str(tmp_path / 'v2.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(V2_SCHEMA)
+    conn.execute('INSERT INTO threats (ts_ms, threat_code, face_count, stable_face_count, confidence, '
+                 'action_taken, screenshot_path) VALUES (1767607200000, 1, 2, 2, 0.9, ?, ?)',
+                 ('Screen Minimized', 'threat_logs/a.jpg'))
+    conn.commit()
+    conn.close()
+
+    conn = connect(path)
+    init_schema(conn)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+
+    (row,) = threats(conn).values()
+    assert row[0] == 1
+    assert row[2] == 'Shoulder Surfing'
+    assert row[3:8] == (2, 2, 0.9, 'Screen Minimized', 'threat_logs/a.jpg')
+    assert row[8] is None
+    assert row[9] == 1767607200000
+
+    with conn:
+        conn.execute(INSERT_THREAT, (1, 'Shoulder Surfing', 2, 2, 0.9, 'Screen Minimized', 'b.jpg', 'b.avi'))
+    assert threats(conn)[2][8] == 'b.avi'
+    conn.close()
+
+
+def test_init_schema_again_is_a_no_op(tmp_path):
+    path = str(tmp_path / 'current.db')
+    conn = connect(path)
+    init_schema(conn)
+    with conn:
+        conn.execute(INSERT_THREAT, (1, 'Shoulder Surfing', 2, 2, 0.9, 'Screen Minimized', 'a.jpg', 'a.avi'))
+    schema = conn.execute('SELECT sql FROM sqlite_master ORDER BY name').fetchall()
+    before = threats(conn)
+
+    init_schema(conn)
+    conn.close()
+    conn = connect(path)
+    init_schema(conn)
+
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+    assert conn.execute('SELECT sql FROM sqlite_master ORDER BY name').fetchall() == schema
+    assert threats(conn) == before
+    conn.close()
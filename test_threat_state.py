@@ -0,0 +1,69 @@
+"""
+Threat state machine tests: the same scenario at different frame rates
+must give the same transitions at the same (observation) times
+"""
+import pytest
+
+from threat_state import (ABSENCE_STARTED, CAMERA, FACE_LOST, RESTORE, SHOULDER_SURFING, USER_ABSENCE,
+                          Threat, ThreatStateMachine)
+
+
+def build_machine(absence_enabled=True):
+    return ThreatStateMachine(
+        shoulder_surfing=Threat(SHOULDER_SURFING, True, 0.5, 3.0),
+        camera=Threat(CAMERA, True, 0.5, 3.0),
+        absence_enabled=absence_enabled,
+        absence_seconds=15.0,
+        grace_seconds=2.0,
+        absence_cooldown=3.0,
+    )
+
+
+def scene(t):
+    """(stable face count, phone in view) at time t"""
+    if 2.0 <= t < 4.0:
+        return 2, False  # Someone looks over the user's shoulder
+    if 6.0 <= t < 7.0:
+        return 1, True   # A phone is held up
+    if t >= 12.0:
+        return 0, False  # The user walks away
+    return 1, False
+
+
+def run(fps, duration=30.0, absence_enabled=True):
+    """Feed the scene at fps; returns [(transition, time)]"""
+    machine = build_machine(absence_enabled)
+    transitions = []
+    for k in range(int(duration * fps) + 1):
+        t = k / fps
+        faces, phone = scene(t)
+        transitions.extend((name, t) for name in machine.update(t, faces, 1.0, phone))
+    return transitions
+
+
+EXPECTED = [
+    (SHOULDER_SURFING, 2.5),  # 2+ faces for confirm_seconds
+    (RESTORE, 5.5),           # Cooldown over and back to one face
+    (CAMERA, 6.5),
+    (RESTORE, 9.5),
+    (FACE_LOST, 12.0),
+    (ABSENCE_STARTED, 14.0),  # After the grace period
+    (USER_ABSENCE, 29.0),     # Grace period + absence threshold
+]
+
+
+@pytest.mark.parametrize('fps', [5, 15, 30, 60])
+def test_same_decisions_at_any_frame_rate(fps):
+    transitions = run(fps)
+    assert [name for name, _ in transitions] == [name for name, _ in EXPECTED]
+    # Each transition lands on the first frames at or after its expected time
+    # (the start of a condition and its confirmation each round up to a frame)
+    for (name, t), (_, expected) in zip(transitions, EXPECTED):
+        assert expected - 1e-9 <= t < expected + 3 / fps, (name, t, expected)
+
+
+def test_absence_disabled_reports_no_absence():
+    names = [name for name, _ in run(15, absence_enabled=False)]
+    assert FACE_LOST in names
+    assert ABSENCE_STARTED not in names
+    assert USER_ABSENCE not in names
@@ -0,0 +1,167 @@
+"""
+Threat state machine for ZeroTrust Workspace Guardian
+Turns stabilized observations into threat decisions. Confirmation windows,
+cooldowns and the face-lost grace period are measured in seconds of observation
+time, never in frames, so the guardian behaves the same at 5 fps or 60 fps and
+when frames are skipped or dropped.
+
+Nothing here reads the clock: update() takes the timestamp of each observation,
+so a sequence of synthetic (time, counts) observations replays deterministically.
+"""
+
+SHOULDER_SURFING = 'shoulder_surfing'
+CAMERA = 'camera_detected'
+USER_ABSENCE = 'user_absence'
+RESTORE = 'restore'
+
+# Informational transitions (no response)
+FACE_LOST = 'face_lost'
+ABSENCE_STARTED = 'absence_started'
+
+
+class Threat:
+    """A condition that must hold for confirm_seconds before it fires"""
+
+    def __init__(self, name, enabled=True, confirm_seconds=0.5, cooldown_seconds=3.0):
+        self.name = name
+        self.enabled = enabled
+        self.confirm_seconds = confirm_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.since = None  # Start of the current uninterrupted run of the condition
+
+    def observe(self, active, timestamp):
+        """Record whether the condition holds now; True once it has held long enough"""
+        if not (self.enabled and active):
+            self.since = None
+            return False
+        if self.since is None:
+            self.since = timestamp
+        return timestamp - self.since >= self.confirm_seconds
+
+    def elapsed(self, timestamp):
+        return 0.0 if self.since is None else timestamp - self.since
+
+
+class ThreatStateMachine:
+    """
+    Shoulder surfing, camera and absence decisions from stabilized counts.
+    update() returns the transitions of one observation, in order: any of
+    FACE_LOST, ABSENCE_STARTED, SHOULDER_SURFING, CAMERA, USER_ABSENCE, RESTORE.
+    """
+
+    def __init__(self, shoulder_surfing=None, camera=None, absence_enabled=True, absence_seconds=15.0,
+                 grace_seconds=2.0, absence_cooldown=3.0, consistency_threshold=0.6):
+        self.shoulder_surfing = shoulder_surfing or Threat(SHOULDER_SURFING)
+        self.camera = camera or Threat(CAMERA)
+        self.absence_enabled = absence_enabled
+        self.absence_seconds = absence_seconds
+        self.grace_seconds = grace_seconds
+        self.absence_cooldown = absence_cooldown
+        self.consistency_threshold = consistency_threshold
+
+        self.privacy_mode = False
+        self.active_threat = None
+        self.hold_until = float('-inf')  # No new response before this time (cooldown)
+        self.lost_since = None  # When the last face disappeared
+        self.absence_reported = False
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            shoulder_surfing=Threat(
+                SHOULDER_SURFING,
+                config.SHOULDER_SURFING['enabled'],
+                config.SHOULDER_SURFING['confirmation_seconds'],
+                config.SHOULDER_SURFING['cooldown_seconds'],
+            ),
+            camera=Threat(
+                CAMERA,
+                config.CAMERA_DETECTION['enabled'],
+                config.CAMERA_DETECTION['confirmation_seconds'],
+                config.CAMERA_DETECTION['cooldown_seconds'],
+            ),
+            absence_enabled=config.USER_ABSENCE['enabled'],
+            absence_seconds=config.USER_ABSENCE['threshold_seconds'],
+            grace_seconds=config.USER_ABSENCE['grace_seconds'],
+            absence_cooldown=config.USER_ABSENCE['cooldown_seconds'],
+            consistency_threshold=config.STABILIZATION['consistency_threshold'],
+        )
+
+    def configure(self, config):
+        """Take new thresholds from config, keeping running timers and privacy mode"""
+        fresh = self.from_config(config)
+        for threat, settings in ((self.shoulder_surfing, fresh.shoulder_surfing), (self.camera, fresh.camera)):
+            threat.enabled = settings.enabled
+            threat.confirm_seconds = settings.confirm_seconds
+            threat.cooldown_seconds = settings.cooldown_seconds
+        self.absence_enabled = fresh.absence_enabled
+        self.absence_seconds = fresh.absence_seconds
+        self.grace_seconds = fresh.grace_seconds
+        self.absence_cooldown = fresh.absence_cooldown
+        self.consistency_threshold = fresh.consistency_threshold
+
+    def update(self, timestamp, stable_face_count, consistency, phone_detected):
+        """Feed one observation; returns the list of transitions it caused"""
+        transitions = []
+        consistent = consistency > self.consistency_threshold
+
+        # Both threats keep their own window, so one never resets the other
+        crowd_confirmed = self.shoulder_surfing.observe(stable_face_count > 1 and consistent, timestamp)
+        phone_confirmed = self.camera.observe(phone_detected, timestamp)
+
+        # Absence: a grace period for turning away, then the absence window
+        if stable_face_count > 0:
+            self.lost_since = None
+            self.absence_reported = False
+        elif self.lost_since is None:
+            self.lost_since = timestamp
+            transitions.append(FACE_LOST)
+        absent_for = self.absent_for(timestamp)
+        if self.absence_enabled and absent_for is not None and consistent and not self.absence_reported:
+            self.absence_reported = True
+            transitions.append(ABSENCE_STARTED)
+        absence_confirmed = (self.absence_enabled and consistent and absent_for is not None
+                             and absent_for >= self.absence_seconds)
+
+        if timestamp >= self.hold_until:
+            if not self.privacy_mode:
+                if crowd_confirmed:
+                    self._protect(self.shoulder_surfing.name, self.shoulder_surfing.cooldown_seconds, timestamp)
+                elif phone_confirmed:
+                    self._protect(self.camera.name, self.camera.cooldown_seconds, timestamp)
+                elif absence_confirmed:
+                    self._protect(USER_ABSENCE, self.absence_cooldown, timestamp)
+                if self.privacy_mode:
+                    transitions.append(self.active_threat)
+            # Clear: exactly one consistent face and no phone in view
+            elif stable_face_count == 1 and consistent and not phone_detected:
+                self.privacy_mode = False
+                self.active_threat = None
+                transitions.append(RESTORE)
+
+        return transitions
+
+    def _protect(self, threat, cooldown, timestamp):
+        self.privacy_mode = True
+        self.active_threat = threat
+        self.hold_until = timestamp + cooldown
+
+    def face_lost_for(self, timestamp):
+        """Seconds since the last face disappeared (None while a face is visible)"""
+        return None if self.lost_since is None else timestamp - self.lost_since
+
+    def absent_for(self, timestamp):
+        """Seconds of absence counted after the grace period (None within it)"""
+        lost_for = self.face_lost_for(timestamp)
+        if lost_for is None or lost_for < self.grace_seconds:
+            return None
+        return lost_for - self.grace_seconds
+
+    def reset(self):
+        self.shoulder_surfing.since = None
+        self.camera.since = None
+        self.privacy_mode = False
+        self.active_threat = None
+        self.hold_until = float('-inf')
+        self.lost_since = None
+        self.absence_reported = False
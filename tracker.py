@@ -0,0 +1,146 @@
+"""
+Face tracking for ZeroTrust Workspace Guardian
+Links face detections across frames so each person keeps a stable track ID,
+predicts where tracks are between detections (so the cascade only has to run
+every Nth frame), and keeps the "USER" identity on the workstation owner.
+"""
+
+import itertools
+
+import numpy as np
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """Pairwise IoU between two (N, 4) and (M, 4) arrays of x, y, w, h boxes"""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    ax1, ay1 = a[:, 0:1], a[:, 1:2]
+    ax2, ay2 = ax1 + a[:, 2:3], ay1 + a[:, 3:4]
+    bx1, by1 = b[:, 0], b[:, 1]
+    bx2, by2 = bx1 + b[:, 2], by1 + b[:, 3]
+
+    w = np.clip(np.minimum(ax2, bx2) - np.maximum(ax1, bx1), 0, None)
+    h = np.clip(np.minimum(ay2, by2) - np.maximum(ay1, by1), 0, None)
+    intersection = w * h
+    union = (a[:, 2:3] * a[:, 3:4]) + (b[:, 2] * b[:, 3]) - intersection
+    return intersection / np.maximum(union, 1e-5)
+
+
+class Track:
+    def __init__(self, track_id, box, timestamp):
+        self.id = track_id
+        self.box = np.asarray(box, dtype=np.float32)
+        self.velocity = np.zeros(2, dtype=np.float32)  # Pixels per second (x, y)
+        self.last_update = timestamp
+        self.hits = 1
+        self.missed = 0  # Detection passes since this track was last matched
+        self.owner = False
+
+    def predicted_box(self, timestamp):
+        box = self.box.copy()
+        box[:2] += self.velocity * (timestamp - self.last_update)
+        return box
+
+    def correct(self, box, timestamp, smoothing=0.5):
+        """Take a matched detection; velocity is smoothed from the centre movement"""
+        box = np.asarray(box, dtype=np.float32)
+        dt = timestamp - self.last_update
+        if dt > 0:
+            moved = (box[:2] + box[2:] / 2) - (self.box[:2] + self.box[2:] / 2)
+            self.velocity = smoothing * self.velocity + (1 - smoothing) * moved / dt
+        self.box = box
+        self.last_update = timestamp
+        self.hits += 1
+        self.missed = 0
+
+    @property
+    def label(self):
+        return "USER" if self.owner else f"PERSON {self.id}"
+
+
+class FaceTracker:
+    def __init__(self, detect_interval=3, iou_threshold=0.3, max_missed=3):
+        self.detect_interval = max(1, detect_interval)
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+
+        self.tracks = []
+        self.ids = itertools.count(1)
+        self.frames_since_detection = None
+
+        # Counters
+        self.detections = 0
+        self.predictions = 0
+
+    def detection_due(self):
+        """True if the cascade should run on this frame"""
+        return self.frames_since_detection is None or self.frames_since_detection + 1 >= self.detect_interval
+
+    def update(self, faces, timestamp):
+        """Match a fresh detection pass to the tracks; returns the visible tracks"""
+        self.frames_since_detection = 0
+        self.detections += 1
+        detections = np.asarray(faces, dtype=np.float32).reshape(-1, 4)
+
+        matched_tracks = set()
+        matched_detections = set()
+        if self.tracks and len(detections):
+            predicted = np.array([track.predicted_box(timestamp) for track in self.tracks])
+            overlap = iou_matrix(predicted, detections)
+            # Greedy assignment, best overlaps first
+            for flat in np.argsort(overlap, axis=None)[::-1]:
+                t, d = divmod(int(flat), len(detections))
+                if overlap[t, d] < self.iou_threshold:
+                    break
+                if t in matched_tracks or d in matched_detections:
+                    continue
+                self.tracks[t].correct(detections[d], timestamp)
+                matched_tracks.add(t)
+                matched_detections.add(d)
+
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+
+        for d, box in enumerate(detections):
+            if d not in matched_detections:
+                self.tracks.append(Track(next(self.ids), box, timestamp))
+
+        self._assign_owner()
+        return self.visible()
+
+    def predict(self, timestamp):
+        """Carry the tracks forward on a frame without detection"""
+        if self.frames_since_detection is not None:
+            self.frames_since_detection += 1
+        self.predictions += 1
+        return self.visible()
+
+    def visible(self):
+        """Tracks matched on the last detection pass (the current face count)"""
+        return [track for track in self.tracks if track.missed == 0]
+
+    def boxes(self, tracks, timestamp):
+        return [tuple(int(round(v)) for v in track.predicted_box(timestamp)) for track in tracks]
+
+    def _assign_owner(self):
+        # The owner is whoever was alone in view; they stay "USER" while their track lives
+        if any(track.owner for track in self.tracks):
+            return
+        visible = self.visible()
+        if len(visible) == 1:
+            visible[0].owner = True
+
+    def reset(self):
+        self.tracks = []
+        self.frames_since_detection = None
+
+    def stats(self):
+        total = self.detections + self.predictions
+        return {
+            'detections': self.detections,
+            'predictions': self.predictions,
+            'tracks': len(self.tracks),
+            'detection_ratio': self.detections / total if total else 0.0,
+        }